@@ -8,7 +8,9 @@ Stats are computed per *show* (concert date), not per raw track:
    back to the individual tracks that contributed to outlier shows.
 """
 
-import statistics
+import itertools
+import math
+from collections import defaultdict
 
 from gdtimings import db
 from gdtimings.config import OUTLIER_STD_MULTIPLIER, MIN_SAMPLES_FOR_STATS, UTILITY_SONGS
@@ -17,18 +19,72 @@ from gdtimings.config import OUTLIER_STD_MULTIPLIER, MIN_SAMPLES_FOR_STATS, UTIL
 def classify_song_types(conn, verbose=True):
     """Mark utility songs (Drums, Space, Jam) as song_type='utility'."""
     updated = 0
-    for name in UTILITY_SONGS:
-        cur = conn.execute(
-            "UPDATE songs SET song_type = 'utility' WHERE canonical_name = ?",
-            (name,),
-        )
-        updated += cur.rowcount
-    conn.commit()
+    with db.transaction(conn):
+        for name in UTILITY_SONGS:
+            cur = conn.execute(
+                "UPDATE songs SET song_type = 'utility' WHERE canonical_name = ?",
+                (name,),
+            )
+            updated += cur.rowcount
     if verbose:
         print(f"  Classified {updated} utility songs")
     return updated
 
 
+_DRUMS_SPACE_IDS_SQL = "SELECT id FROM songs WHERE canonical_name IN (?, ?)"
+
+# Sandwich groups computed in SQL.  Within each release, Drums/Space tracks
+# are dropped and every remaining track is compared with the previous one:
+# it *continues* a sandwich when it is the same song, both have durations,
+# and at least one Drums/Space track sat between them (a gap in position).
+# A running count of non-continuations numbers the groups; groups of two or
+# more tracks are sandwiches.  Yields (id, sandwich_duration, is_start): the
+# first segment carries the group total, continuations carry 0.
+_SANDWICH_SQL = """
+    WITH ordered AS (
+        SELECT id, release_id, song_id, duration_seconds AS dur,
+               COALESCE(song_id IN (
+                   SELECT id FROM songs WHERE canonical_name IN (?, ?)
+               ), 0) AS is_ds,
+               ROW_NUMBER() OVER (
+                   PARTITION BY release_id ORDER BY disc_number, track_number, id
+               ) AS pos
+        FROM tracks
+    ),
+    linked AS (
+        SELECT id, release_id, dur, pos,
+               COALESCE(
+                   song_id = LAG(song_id) OVER w
+                   AND dur IS NOT NULL
+                   AND LAG(dur) OVER w IS NOT NULL
+                   AND pos - LAG(pos) OVER w > 1,
+               0) AS cont
+        FROM ordered
+        WHERE NOT is_ds
+        WINDOW w AS (PARTITION BY release_id ORDER BY pos)
+    ),
+    grouped AS (
+        SELECT id, release_id, dur, cont,
+               SUM(NOT cont) OVER (PARTITION BY release_id ORDER BY pos) AS grp
+        FROM linked
+    ),
+    sized AS (
+        SELECT id, dur, cont,
+               COUNT(*) OVER g AS n,
+               SUM(dur) OVER g AS total
+        FROM grouped
+        WINDOW g AS (PARTITION BY release_id, grp)
+    )
+    SELECT id,
+           CASE WHEN cont THEN 0 ELSE total END AS sandwich_duration,
+           NOT cont AS is_start
+    FROM sized
+    WHERE n > 1
+"""
+
+_SET_SANDWICH_SQL = "UPDATE tracks SET sandwich_duration = ? WHERE id = ?"
+
+
 def detect_sandwiches(conn, verbose=True):
     """Detect Drums/Space sandwich patterns and set sandwich_duration.
 
@@ -41,203 +97,161 @@ def detect_sandwiches(conn, verbose=True):
     - Continuation X segments get sandwich_duration = 0
     """
     # Look up Drums and Space song_ids
-    drums_space_ids = set()
-    for name in ("Drums", "Space"):
-        row = conn.execute(
-            "SELECT id FROM songs WHERE canonical_name = ?", (name,)
-        ).fetchone()
-        if row:
-            drums_space_ids.add(row["id"])
+    drums_space_ids = {
+        row["id"] for row in conn.execute(_DRUMS_SPACE_IDS_SQL, ("Drums", "Space"))
+    }
 
     if not drums_space_ids:
         if verbose:
             print("  No Drums/Space songs found — skipping sandwich detection")
         return 0
 
-    # Reset all sandwich_duration to NULL
-    conn.execute("UPDATE tracks SET sandwich_duration = NULL")
-
-    # Get all releases with their ordered tracklists
-    releases = conn.execute("SELECT DISTINCT release_id FROM tracks").fetchall()
+    updates = []  # (sandwich_duration, track_id)
     sandwiches_found = 0
-
-    for rel_row in releases:
-        release_id = rel_row["release_id"]
-        tracks = conn.execute(
-            """SELECT id, song_id, duration_seconds, disc_number, track_number
-               FROM tracks
-               WHERE release_id = ?
-               ORDER BY disc_number, track_number""",
-            (release_id,),
-        ).fetchall()
-
-        track_list = [(t["id"], t["song_id"], t["duration_seconds"],
-                        t["disc_number"], t["track_number"]) for t in tracks]
-
-        # Scan for sandwich patterns
-        # Build groups: sequences of the same song_id interrupted only by Drums/Space
-        i = 0
-        while i < len(track_list):
-            tid, song_id, dur, _, _ = track_list[i]
-
-            # Skip Drums/Space/NULL/no-duration tracks as starting points
-            if song_id is None or song_id in drums_space_ids or dur is None:
-                i += 1
-                continue
-
-            # Found a real song. Scan forward for a sandwich pattern:
-            # collect this segment, then look for Drums/Space, then same song again
-            segments = [(tid, dur)]  # (track_id, duration) for this song
-            j = i + 1
-            in_drums_space = False
-
-            while j < len(track_list):
-                jtid, jsong_id, jdur, _, _ = track_list[j]
-
-                if jsong_id in drums_space_ids:
-                    in_drums_space = True
-                    j += 1
-                    continue
-
-                if jsong_id == song_id and in_drums_space and jdur is not None:
-                    # Found a continuation of the same song after Drums/Space
-                    segments.append((jtid, jdur))
-                    in_drums_space = False
-                    j += 1
-                    continue
-
-                # Different song (not Drums/Space) — end of pattern
-                break
-
-            if len(segments) > 1:
-                # This is a sandwich — sum all segment durations
-                total_dur = sum(d for _, d in segments)
-                # First segment gets the total
-                conn.execute(
-                    "UPDATE tracks SET sandwich_duration = ? WHERE id = ?",
-                    (total_dur, segments[0][0]),
-                )
-                # Continuation segments get 0 (excluded from MAX)
-                for seg_id, _ in segments[1:]:
-                    conn.execute(
-                        "UPDATE tracks SET sandwich_duration = ? WHERE id = ?",
-                        (0, seg_id),
-                    )
-                sandwiches_found += 1
-
-            # Advance past the segments we consumed
-            if len(segments) > 1:
-                i = j
-            else:
-                i += 1
-
-    conn.commit()
+    for tid, sandwich_dur, is_start in db.execute_tuples(
+        conn, _SANDWICH_SQL, ("Drums", "Space")
+    ):
+        updates.append((sandwich_dur, tid))
+        sandwiches_found += is_start
+
+    # Reset all sandwich_duration to NULL, then apply the new values
+    with db.transaction(conn):
+        conn.execute("UPDATE tracks SET sandwich_duration = NULL")
+        conn.executemany(_SET_SANDWICH_SQL, updates)
     if verbose:
         print(f"  Detected {sandwiches_found} Drums/Space sandwiches")
     return sandwiches_found
 
 
-def _per_show_durations(conn):
-    """Return per-show durations for every song, deduped by concert date.
+# One row per (song_id, concert_date): the best release's longest effective
+# duration.  Read by _per_song_shows().
+_PER_SHOW_SQL = """
+    SELECT sub.song_id, sub.concert_date, sub.show_dur
+    FROM (
+        SELECT t.song_id, r.concert_date,
+               MAX(COALESCE(NULLIF(t.sandwich_duration, 0), t.duration_seconds)) AS show_dur,
+               ROW_NUMBER() OVER (
+                   PARTITION BY t.song_id, r.concert_date
+                   ORDER BY r.quality_rank DESC,
+                            MAX(COALESCE(NULLIF(t.sandwich_duration, 0), t.duration_seconds)) DESC
+               ) AS rn
+        FROM tracks t
+        JOIN releases r ON t.release_id = r.id
+        WHERE t.song_id IS NOT NULL
+          AND t.duration_seconds IS NOT NULL
+          AND r.concert_date IS NOT NULL
+        GROUP BY t.song_id, r.concert_date, r.id
+    ) sub
+    WHERE sub.rn = 1
+"""
+
 
-    For each (song_id, concert_date):
+def _per_song_shows(conn):
+    """Yield (song_id, summary, date_durs) for every song, in one SQL pass.
+
+    date_durs is the song's per-show durations, deduped by concert date:
     - MAX(effective_duration) within each release, where effective_duration
       prefers sandwich_duration (summed Drums-sandwich) over raw duration
     - Best release per date via ROW_NUMBER (highest quality_rank, then
       longest duration as tiebreaker)
-
-    Returns dict: song_id → [(concert_date, duration_seconds), ...]
+    as [(concert_date, duration_seconds), ...] sorted by duration, so the
+    median can be read off by position.
+
+    summary is (times_played, mean, variance, first_played, last_played),
+    computed by window aggregates over the same rows.  variance is the
+    sample variance, or None for songs played at only one show.  It is
+    summed from deviations about the song's mean rather than from raw
+    squares, so it stays accurate for long, tightly clustered durations.
     """
-    rows = conn.execute("""
-        SELECT sub.song_id, sub.concert_date, sub.show_dur
+    rows = db.execute_tuples(conn, f"""
+        SELECT song_id, concert_date, show_dur,
+               COUNT(*) OVER (PARTITION BY song_id),
+               song_mean,
+               SUM((show_dur - song_mean) * (show_dur - song_mean))
+                   OVER (PARTITION BY song_id),
+               MIN(concert_date) OVER (PARTITION BY song_id),
+               MAX(concert_date) OVER (PARTITION BY song_id)
         FROM (
-            SELECT t.song_id, r.concert_date,
-                   MAX(COALESCE(NULLIF(t.sandwich_duration, 0), t.duration_seconds)) AS show_dur,
-                   ROW_NUMBER() OVER (
-                       PARTITION BY t.song_id, r.concert_date
-                       ORDER BY r.quality_rank DESC,
-                                MAX(COALESCE(NULLIF(t.sandwich_duration, 0), t.duration_seconds)) DESC
-                   ) AS rn
-            FROM tracks t
-            JOIN releases r ON t.release_id = r.id
-            WHERE t.song_id IS NOT NULL
-              AND t.duration_seconds IS NOT NULL
-              AND r.concert_date IS NOT NULL
-            GROUP BY t.song_id, r.concert_date, r.id
-        ) sub
-        WHERE sub.rn = 1
-        ORDER BY sub.song_id, sub.concert_date
-    """).fetchall()
-
-    result = {}
-    for r in rows:
-        result.setdefault(r["song_id"], []).append(
-            (r["concert_date"], r["show_dur"])
+            SELECT ps.*, AVG(ps.show_dur) OVER (PARTITION BY ps.song_id) AS song_mean
+            FROM ({_PER_SHOW_SQL}) ps
         )
+        ORDER BY song_id, show_dur, concert_date
+    """)
+    for song_id, group in itertools.groupby(rows, key=lambda r: r[0]):
+        first = next(group)
+        _, _, _, n, mean_dur, sq_dev, first_played, last_played = first
+        var_dur = sq_dev / (n - 1) if n > 1 else None
+        date_durs = [(first[1], first[2])]
+        date_durs.extend((r[1], r[2]) for r in group)
+        yield song_id, (n, mean_dur, var_dur, first_played, last_played), date_durs
+
+
+def _timed_tracks_by_song(conn):
+    """Return dict: song_id → [(track_id, concert_date), ...] for timed tracks."""
+    result = defaultdict(list)
+    for song_id, track_id, concert_date in db.execute_tuples(
+        conn,
+        """SELECT t.song_id, t.id, r.concert_date
+           FROM tracks t
+           JOIN releases r ON t.release_id = r.id
+           WHERE t.song_id IS NOT NULL AND t.duration_seconds IS NOT NULL""",
+    ):
+        result[song_id].append((track_id, concert_date))
     return result
 
 
+def _sorted_median(date_durs):
+    """Median duration of a list of (date, duration) already sorted by duration."""
+    mid = len(date_durs) // 2
+    if len(date_durs) % 2:
+        return date_durs[mid][1]
+    return (date_durs[mid - 1][1] + date_durs[mid][1]) / 2
+
+
+def _outlier_dates(date_durs, mean_dur, std_dur):
+    """Return the concert dates whose duration lies beyond the outlier cutoff."""
+    threshold = OUTLIER_STD_MULTIPLIER * std_dur
+    return {date for date, dur in date_durs if abs(dur - mean_dur) > threshold}
+
+
 def compute_song_stats(conn, verbose=True):
     """Compute duration statistics for all songs and flag outliers.
 
     Uses per-show aggregated durations (one value per concert date) so that
-    split songs and multiple tapers don't skew the results.
+    split songs and multiple tapers don't skew the results.  Count, mean,
+    variance and date range come from window aggregates in the same scan
+    that returns the per-show values the median needs.
     """
-    show_data = _per_show_durations(conn)
-    updated = 0
+    song_tracks = _timed_tracks_by_song(conn)
+    stats_rows = []
+    outlier_rows = []
     outliers_found = 0
 
-    for song_id, date_durs in show_data.items():
-        durations = [d for _, d in date_durs]
-        dates = sorted(d for d, _ in date_durs)
-        times_played = len(durations)
-
-        if not durations:
-            continue
-
-        first_played = dates[0]
-        last_played = dates[-1]
-
-        median_dur = statistics.median(durations)
-        mean_dur = statistics.mean(durations)
-        std_dur = statistics.stdev(durations) if len(durations) >= 2 else 0.0
-
-        db.update_song_stats(
-            conn, song_id,
-            times_played=times_played,
-            median_duration=median_dur,
-            mean_duration=mean_dur,
-            std_duration=std_dur,
-            first_played=first_played,
-            last_played=last_played,
-        )
-        updated += 1
+    for song_id, summary, date_durs in _per_song_shows(conn):
+        times_played, mean_dur, var_dur, first_played, last_played = summary
+        median_dur = _sorted_median(date_durs)
+        std_dur = math.sqrt(var_dur) if var_dur is not None else 0.0
+
+        stats_rows.append((times_played, median_dur, mean_dur, std_dur,
+                           first_played, last_played, song_id))
 
         # Flag outliers on per-show durations, then propagate to tracks
         if times_played >= MIN_SAMPLES_FOR_STATS and std_dur > 0:
-            outlier_dates = set()
-            for date, dur in date_durs:
-                deviation = abs(dur - mean_dur)
-                if deviation > OUTLIER_STD_MULTIPLIER * std_dur:
-                    outlier_dates.add(date)
+            outlier_dates = _outlier_dates(date_durs, mean_dur, std_dur)
 
             # Mark all tracks belonging to outlier shows
             if outlier_dates:
-                tracks = conn.execute(
-                    """SELECT t.id, r.concert_date
-                       FROM tracks t
-                       JOIN releases r ON t.release_id = r.id
-                       WHERE t.song_id = ?
-                         AND t.duration_seconds IS NOT NULL""",
-                    (song_id,),
-                ).fetchall()
-                for t in tracks:
-                    is_outlier = 1 if t["concert_date"] in outlier_dates else 0
+                for track_id, concert_date in song_tracks[song_id]:
+                    is_outlier = 1 if concert_date in outlier_dates else 0
                     if is_outlier:
                         outliers_found += 1
-                    db.mark_outlier(conn, t["id"], is_outlier)
+                    outlier_rows.append((is_outlier, track_id))
 
-    conn.commit()
+    # Flush all writes as two prepared statements in one transaction
+    with db.transaction(conn):
+        db.update_song_stats_many(conn, stats_rows)
+        db.mark_outliers(conn, outlier_rows)
+    updated = len(stats_rows)
 
     if verbose:
         print(f"  Updated stats for {updated} songs")
@@ -246,6 +260,12 @@ def compute_song_stats(conn, verbose=True):
     return updated, outliers_found
 
 
+_SUMMARY_HEADER = (
+    f"  {'Song':<40} {'N':>4} {'Median':>8} {'Mean':>8} {'StdDev':>8}\n"
+    f"  {'-'*40} {'-'*4} {'-'*8} {'-'*8} {'-'*8}"
+)
+
+
 def print_song_summary(conn, top_n=20):
     """Print a summary of songs with the most variability."""
     rows = conn.execute(
@@ -262,14 +282,13 @@ def print_song_summary(conn, top_n=20):
         print("  No songs with enough data for analysis.")
         return
 
-    print(f"\n  Top {len(rows)} most variable songs:")
-    print(f"  {'Song':<40} {'N':>4} {'Median':>8} {'Mean':>8} {'StdDev':>8}")
-    print(f"  {'-'*40} {'-'*4} {'-'*8} {'-'*8} {'-'*8}")
+    lines = [f"\n  Top {len(rows)} most variable songs:", _SUMMARY_HEADER]
     for r in rows:
         med = _fmt_duration(r["median_duration"])
         mean = _fmt_duration(r["mean_duration"])
         std = _fmt_duration(r["std_duration"])
-        print(f"  {r['canonical_name']:<40} {r['times_played']:>4} {med:>8} {mean:>8} {std:>8}")
+        lines.append(f"  {r['canonical_name']:<40} {r['times_played']:>4} {med:>8} {mean:>8} {std:>8}")
+    print("\n".join(lines))
 
 
 def _fmt_duration(seconds):
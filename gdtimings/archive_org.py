@@ -9,48 +9,53 @@ Scraping pipeline:
 6. Normalize song titles and store in DB
 """
 
+import functools
+import itertools
 import re
-import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
-from gdtimings.cache import read_cache as _read_cache, write_cache as _write_cache
+from gdtimings.cache import (
+    read_cache as _read_cache,
+    scan_cache as _scan_cache,
+    write_cache as _write_cache,
+)
 from gdtimings.config import (
     ARCHIVE_CACHE_DIR,
+    ARCHIVE_COMMIT_EVERY,
     ARCHIVE_DEFAULT_WORKERS,
     ARCHIVE_METADATA_URL,
     ARCHIVE_RATE_LIMIT,
+    ARCHIVE_READ_WORKERS,
     ARCHIVE_SCRAPE_URL,
     ARCHIVE_USER_AGENT,
     QUALITY_RANKS,
 )
-from gdtimings.http_utils import api_get_with_retry, create_session, progress_line
+from gdtimings.http_utils import (
+    TokenBucket,
+    api_get_with_retry,
+    create_session,
+    progress_line,
+)
 from gdtimings import db
 from gdtimings.location import parse_city_state
-from gdtimings.normalize import normalize_song
-
-
-def _session():
-    return create_session(ARCHIVE_USER_AGENT)
-
+from gdtimings.normalize import invalidate_db_songs_cache, make_song_resolver
 
 
+def _session(pool_size=None):
+    return create_session(ARCHIVE_USER_AGENT, pool_size=pool_size)
 
-_thread_local = threading.local()
 
-
-def _thread_session():
-    """Get or create a thread-local requests.Session."""
-    if not hasattr(_thread_local, "session"):
-        _thread_local.session = _session()
-    return _thread_local.session
+# One bucket for every fetch thread; None when IA pacing is disabled
+_LIMITER = TokenBucket(1 / ARCHIVE_RATE_LIMIT) if ARCHIVE_RATE_LIMIT > 0 else None
 
 
 def _api_get(session, url, params=None, max_retries=3):
     """Make an API request with rate limiting and retry."""
     return api_get_with_retry(session, url, params=params,
-                              rate_limit=ARCHIVE_RATE_LIMIT,
-                              max_retries=max_retries)
+                              rate_limit=0, max_retries=max_retries,
+                              limiter=_LIMITER)
 
 
 # ── Collection search ────────────────────────────────────────────────
@@ -97,6 +102,12 @@ def search_collection(session):
 
 # ── Identifier parsing ───────────────────────────────────────────────
 
+_TYPE_SEGMENTS = {"sbd": "SBD", "mtx": "MTX", "matrix": "MTX", "aud": "AUD"}
+
+# Earliest of the first four "."-separated segments that is exactly a type
+_RE_TYPE_SEGMENT = re.compile(r'(?:[^.]*\.){0,3}?(sbd|mtx|matrix|aud)(?=\.|\Z)')
+
+
 def parse_recording_type(identifier, metadata=None):
     """Detect recording type (SBD/AUD/MTX) from identifier or metadata.
 
@@ -105,17 +116,11 @@ def parse_recording_type(identifier, metadata=None):
         gd1969-11-08.aud.unknown.12345.shnf        (audience)
         gd1990-03-29.mtx.seamons.12345.shnf        (matrix)
     """
-    id_lower = identifier.lower()
-
-    # Check identifier segments (split by ".")
-    parts = id_lower.split(".")
-    for part in parts[:4]:  # type is usually in first few segments
-        if part == "sbd":
-            return "SBD"
-        if part == "mtx" or part == "matrix":
-            return "MTX"
-        if part == "aud":
-            return "AUD"
+    # Check identifier segments (split by "."); type is usually in the
+    # first few, so only the first four are considered
+    m = _RE_TYPE_SEGMENT.match(identifier.lower())
+    if m:
+        return _TYPE_SEGMENTS[m.group(1)]
 
     # Fall back to metadata source field
     if metadata:
@@ -130,25 +135,41 @@ def parse_recording_type(identifier, metadata=None):
     return "AUD"  # default for live recordings
 
 
+# Identifier date formats, tried in order
+_RE_DATE_4 = re.compile(r'gd(\d{4})-(\d{2})-(\d{2})')    # gd1977-05-08
+_RE_DATE_2 = re.compile(r'gd(\d{2})-(\d{2})-(\d{2})')    # gd77-05-08
+_RE_DATE_COMPACT = re.compile(r'gd(\d{4})(\d{2})(\d{2})')  # gd19770508
+
+_RE_META_DATE = re.compile(r'(\d{4}-\d{2}-\d{2})')
+_RE_STRIP_EXT = re.compile(r'\.[^.]+$')
+
+
 def parse_date_from_identifier(identifier):
     """Extract YYYY-MM-DD date from an archive.org identifier.
 
     Formats: gd1977-05-08..., gd77-05-08..., gd19770508...
     """
+    # Fast path: nearly every identifier starts with gdYYYY-MM-DD
+    if (len(identifier) >= 12 and identifier[:2] == "gd"
+            and identifier[6] == "-" and identifier[9] == "-"
+            and identifier[2:6].isdecimal() and identifier[7:9].isdecimal()
+            and identifier[10:12].isdecimal()):
+        return f"{identifier[2:6]}-{identifier[7:9]}-{identifier[10:12]}"
+
     # gd + 4-digit year with dashes
-    m = re.search(r'gd(\d{4})-(\d{2})-(\d{2})', identifier)
+    m = _RE_DATE_4.search(identifier)
     if m:
         return f"{m.group(1)}-{m.group(2)}-{m.group(3)}"
 
     # gd + 2-digit year with dashes
-    m = re.search(r'gd(\d{2})-(\d{2})-(\d{2})', identifier)
+    m = _RE_DATE_2.search(identifier)
     if m:
         year = int(m.group(1))
         full_year = 1900 + year if year >= 60 else 2000 + year
         return f"{full_year}-{m.group(2)}-{m.group(3)}"
 
     # Compact: gd19770508
-    m = re.search(r'gd(\d{4})(\d{2})(\d{2})', identifier)
+    m = _RE_DATE_COMPACT.search(identifier)
     if m:
         return f"{m.group(1)}-{m.group(2)}-{m.group(3)}"
 
@@ -157,18 +178,26 @@ def parse_date_from_identifier(identifier):
 
 # ── Track extraction ─────────────────────────────────────────────────
 
+_AUDIO_KEYWORDS = ("flac", "mp3", "ogg", "shorten", "shn", "lossless",
+                   "wav", "aiff", "m4a", "aac", "opus")
+
+
+@functools.lru_cache(maxsize=256)
 def _is_audio_format(fmt):
-    """Check if an archive.org file format string indicates audio."""
+    """Check if an archive.org file format string indicates audio.
+
+    Format strings come from a small fixed vocabulary ("Flac", "VBR MP3",
+    "24bit Flac", ...), so results are memoized.
+    """
     fmt_lower = fmt.lower()
-    audio_keywords = ("flac", "mp3", "ogg", "shorten", "shn", "lossless",
-                      "wav", "aiff", "m4a", "aac", "opus")
-    return any(kw in fmt_lower for kw in audio_keywords)
+    return any(kw in fmt_lower for kw in _AUDIO_KEYWORDS)
 
 
 def _extract_tracks(files):
     """Filter files to original audio tracks with title and length.
 
-    Returns a sorted, deduplicated list of track dicts.
+    Returns a sorted, deduplicated list of (title_raw, track, duration)
+    tuples.
     """
     tracks = []
     seen_track_nums = set()
@@ -198,7 +227,7 @@ def _extract_tracks(files):
         title = f.get("title") or ""
         if not title:
             name = f.get("name", "")
-            title = re.sub(r'\.[^.]+$', '', name)  # strip extension
+            title = _RE_STRIP_EXT.sub('', name)  # strip extension
             if not title:
                 continue
 
@@ -216,26 +245,19 @@ def _extract_tracks(files):
         if track_num:
             seen_track_nums.add(track_num)
 
-        tracks.append({
-            "title_raw": title,
-            "track": track_num,
-            "duration": duration,
-        })
+        tracks.append((title, track_num, duration))
 
     # Sort by track number (or by list order if no track numbers)
-    tracks.sort(key=lambda t: (t["track"] or 999, t["title_raw"]))
+    tracks.sort(key=lambda t: (t[1] or 999, t[0]))
 
     # Assign track numbers if missing
-    for i, t in enumerate(tracks, 1):
-        if t["track"] is None:
-            t["track"] = i
-
-    return tracks
+    return [(title, i if track_num is None else track_num, duration)
+            for i, (title, track_num, duration) in enumerate(tracks, 1)]
 
 
 # ── Item scraping ────────────────────────────────────────────────────
 
-def _fetch_to_cache(identifier, cache_dir, max_age_seconds=0):
+def _fetch_to_cache(session, identifier, cache_dir, max_age_seconds=0):
     """Fetch metadata for one identifier and write to cache.
 
     Returns (identifier, True) on success, (identifier, False) on failure.
@@ -246,7 +268,7 @@ def _fetch_to_cache(identifier, cache_dir, max_age_seconds=0):
 
     url = ARCHIVE_METADATA_URL.format(identifier=identifier)
     try:
-        data = _api_get(_thread_session(), url)
+        data = _api_get(session, url)
         if data:
             _write_cache(cache_dir, identifier, data)
             return identifier, True
@@ -255,30 +277,84 @@ def _fetch_to_cache(identifier, cache_dir, max_age_seconds=0):
     return identifier, False
 
 
-def _process_from_cache(conn, identifier, data):
-    """Process cached metadata JSON and insert into DB.
+# Metadata fields _process_from_cache() reads; everything else is dropped
+_METADATA_FIELDS = ("title", "date", "venue", "coverage", "taper", "lineage",
+                    "source")
 
-    Returns (release_id, track_count) or (None, 0) if skipped.
+
+def _read_slim_cache(cache_dir, identifier):
+    """Read a cached item, keeping only the fields Phase 2 uses.
+
+    Item metadata can run to hundreds of KB, mostly derivative files and
+    descriptive text.  Trimming on the reader thread keeps only original
+    files and the handful of metadata fields, so the prefetch window holds
+    small dicts instead of full documents.
     """
-    source_id = f"archive:{identifier}"
-    existing_id = db.release_exists(conn, source_id)
-    if existing_id:
-        return existing_id, 0
+    data = _read_cache(cache_dir, identifier)
+    if not data or "metadata" not in data:
+        return data
+    metadata = data["metadata"]
+    return {
+        "metadata": {k: metadata[k] for k in _METADATA_FIELDS if k in metadata},
+        "files": [f for f in data.get("files", [])
+                  if f.get("source") == "original"],
+    }
+
+
+def _load_prepared(cache_dir, identifier):
+    """Worker: read one cache entry and prepare it for insertion.
+
+    Returns (found, prepared); found is False when the entry is missing or
+    unreadable, prepared is None when the item has nothing to insert.
+    """
+    data = _read_slim_cache(cache_dir, identifier)
+    if data is None:
+        return False, None
+    return True, _prepare_release(identifier, data)
 
+
+def _iter_prepared(cache_dir, identifiers, workers=ARCHIVE_READ_WORKERS):
+    """Yield (identifier, future of _load_prepared()) in input order.
+
+    Reading, JSON parsing and track extraction run in worker processes,
+    off the GIL, while the caller does the DB work.  At most workers * 4
+    items are in flight at once, which bounds memory.  Call .result()
+    inside the caller's error handling: worker exceptions surface there.
+    """
+    it = iter(identifiers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        window = deque(
+            (ident, pool.submit(_load_prepared, cache_dir, ident))
+            for ident in itertools.islice(it, workers * 4)
+        )
+        while window:
+            ident, future = window.popleft()
+            nxt = next(it, None)
+            if nxt is not None:
+                window.append((nxt, pool.submit(_load_prepared, cache_dir, nxt)))
+            yield ident, future
+
+
+def _prepare_release(identifier, data):
+    """Turn item metadata into (release fields, tracks), or None to skip.
+
+    A pure function of its inputs (no DB access), so Phase 2 can run it in
+    worker processes.  tracks is the _extract_tracks() list.
+    """
     if not data or "metadata" not in data:
-        return None, 0
+        return None
 
     metadata = data["metadata"]
     files = data.get("files", [])
 
     tracks = _extract_tracks(files)
     if not tracks:
-        return None, 0
+        return None
 
     concert_date = parse_date_from_identifier(identifier)
     if not concert_date:
         meta_date = metadata.get("date", "")
-        m = re.match(r'(\d{4}-\d{2}-\d{2})', meta_date)
+        m = _RE_META_DATE.match(meta_date)
         if m:
             concert_date = m.group(1)
 
@@ -294,10 +370,9 @@ def _process_from_cache(conn, identifier, data):
 
     title = metadata.get("title", identifier)
 
-    release_id = db.insert_release(
-        conn,
+    release = dict(
         source_type="archive.org",
-        source_id=source_id,
+        source_id=f"archive:{identifier}",
         title=title,
         concert_date=concert_date,
         venue=venue,
@@ -311,26 +386,48 @@ def _process_from_cache(conn, identifier, data):
         lineage=lineage,
         source_detail=source_detail,
     )
+    return release, tracks
 
-    for t in tracks:
-        song_id, _, _ = normalize_song(conn, t["title_raw"])
-        db.insert_track(
-            conn,
-            release_id=release_id,
-            title_raw=t["title_raw"],
-            disc_number=1,
-            track_number=t["track"],
-            song_id=song_id,
-            duration_seconds=t["duration"],
-            segue=0,
-        )
-    conn.commit()
+
+def _process_prepared(conn, identifier, prepared, resolve_song=None):
+    """Insert a _prepare_release() result unless the release already exists.
+
+    resolve_song: raw title → song_id; pass one make_song_resolver() per
+    run to share its memo across releases.  Does not commit; callers
+    commit in batches.
+
+    Returns (release_id, track_count) or (None, 0) if skipped.
+    """
+    if prepared is None:
+        return db.release_exists(conn, f"archive:{identifier}"), 0
+
+    release, tracks = prepared
+    release_id = db.insert_release_if_new(conn, **release)
+    if release_id is None:
+        return db.release_exists(conn, release["source_id"]), 0
+
+    if resolve_song is None:
+        resolve_song = make_song_resolver(conn)
+    rows = []
+    for title_raw, track_num, duration in tracks:
+        rows.append((release_id, resolve_song(title_raw), title_raw, 1, track_num,
+                     None, duration, None, 0))
+    db.insert_tracks_many(conn, rows)
 
     return release_id, len(tracks)
 
 
-def scrape_item(conn, session, identifier, cache_dir=None):
-    """Scrape a single archive.org item and store in DB.
+def _process_from_cache(conn, identifier, data, resolve_song=None):
+    """Process cached metadata JSON and insert into DB (caller commits).
+
+    Returns (release_id, track_count) or (None, 0) if skipped.
+    """
+    return _process_prepared(conn, identifier, _prepare_release(identifier, data),
+                             resolve_song)
+
+
+def scrape_item(conn, session, identifier, cache_dir=None, resolve_song=None):
+    """Scrape a single archive.org item and store in DB (caller commits).
 
     Returns (release_id, track_count) or (None, 0) if skipped/failed.
     """
@@ -347,13 +444,13 @@ def scrape_item(conn, session, identifier, cache_dir=None):
             if data:
                 _write_cache(cache_dir, identifier, data)
         if data:
-            return _process_from_cache(conn, identifier, data)
+            return _process_from_cache(conn, identifier, data, resolve_song)
         return None, 0
 
     # Original behavior: fetch and process inline
     url = ARCHIVE_METADATA_URL.format(identifier=identifier)
     data = _api_get(session, url)
-    return _process_from_cache(conn, identifier, data) if data else (None, 0)
+    return _process_from_cache(conn, identifier, data, resolve_song) if data else (None, 0)
 
 
 # ── Main entry point ─────────────────────────────────────────────────
@@ -390,14 +487,12 @@ def scrape_all(conn, full=False, verbose=True, workers=None, use_cache=True,
 
     # ── Pre-filter: skip identifiers already in DB (unless --full) ──
     if not full:
-        existing = set()
-        for ident in identifiers:
-            source_id = f"archive:{ident}"
-            if db.release_exists(conn, source_id):
-                existing.add(ident)
+        existing = db.existing_source_ids(
+            conn, (f"archive:{i}" for i in identifiers)
+        )
         if existing and verbose:
             print(f"  Skipping {len(existing)} identifiers already in DB")
-        identifiers = [i for i in identifiers if i not in existing]
+        identifiers = [i for i in identifiers if f"archive:{i}" not in existing]
 
     if not identifiers:
         if verbose:
@@ -411,8 +506,11 @@ def scrape_all(conn, full=False, verbose=True, workers=None, use_cache=True,
     cache_dir = ARCHIVE_CACHE_DIR
 
     # ── Phase 1: Parallel fetch to cache ──
+    cache_index = _scan_cache(cache_dir)
+    now = time.time()
     to_fetch = [i for i in identifiers
-                if _read_cache(cache_dir, i, max_age_seconds) is None]
+                if i not in cache_index
+                or (max_age_seconds > 0 and now - cache_index[i] > max_age_seconds)]
 
     if verbose:
         print(f"  Phase 1: {len(to_fetch)} to fetch, "
@@ -423,9 +521,12 @@ def scrape_all(conn, full=False, verbose=True, workers=None, use_cache=True,
         errors = 0
         t_start = time.monotonic()
 
+        # One session shared by all workers, its pool sized to match
+        fetch_session = _session(pool_size=workers)
         with ThreadPoolExecutor(max_workers=workers) as pool:
             futures = {
-                pool.submit(_fetch_to_cache, ident, cache_dir, max_age_seconds): ident
+                pool.submit(_fetch_to_cache, fetch_session, ident, cache_dir,
+                            max_age_seconds): ident
                 for ident in to_fetch
             }
             for future in as_completed(futures):
@@ -450,30 +551,45 @@ def scrape_all(conn, full=False, verbose=True, workers=None, use_cache=True,
             print(f"  Phase 1 done: {fetched} fetched, {errors} errors "
                   f"({elapsed:.0f}s)\n")
 
-    # ── Phase 2: Serial DB processing from cache ──
+    # ── Phase 2: DB processing from cache (parsing in worker processes) ──
+    # Releases already in the DB would be skipped after parsing anyway, so
+    # don't read them at all.  (Without --full they were filtered above.)
+    if full:
+        existing = db.existing_source_ids(
+            conn, (f"archive:{i}" for i in identifiers)
+        )
+        to_process = [i for i in identifiers if f"archive:{i}" not in existing]
+    else:
+        to_process = identifiers
+
     if verbose:
-        print(f"  Phase 2: Processing {len(identifiers)} items from cache...")
+        print(f"  Phase 2: Processing {len(to_process)} items from cache...")
 
     total_releases = 0
     total_tracks = 0
-    skipped = 0
+    skipped = len(identifiers) - len(to_process)
     errors = 0
 
+    resolve_song = make_song_resolver(conn)
     t_start = time.monotonic()
-    for i, identifier in enumerate(identifiers, 1):
-        data = _read_cache(cache_dir, identifier)
-        if data is None:
-            errors += 1
-            continue
-
+    prepared_items = _iter_prepared(cache_dir, to_process)
+    for i, (identifier, future) in enumerate(prepared_items, 1):
+        if i % ARCHIVE_COMMIT_EVERY == 0:
+            conn.commit()
+            invalidate_db_songs_cache()
         try:
-            release_id, track_count = _process_from_cache(conn, identifier, data)
+            found, prepared = future.result()
+            if not found:
+                errors += 1
+                continue
+            release_id, track_count = _process_prepared(
+                conn, identifier, prepared, resolve_song)
             if track_count > 0:
                 total_releases += 1
                 total_tracks += track_count
                 if verbose and total_releases % 100 == 0:
                     elapsed = time.monotonic() - t_start
-                    print(f"    {progress_line(i, len(identifiers), elapsed)} "
+                    print(f"    {progress_line(i, len(to_process), elapsed)} "
                           f"{total_releases} releases, {total_tracks} tracks")
             elif release_id:
                 skipped += 1
@@ -481,6 +597,7 @@ def scrape_all(conn, full=False, verbose=True, workers=None, use_cache=True,
             errors += 1
             if verbose:
                 print(f"    ERROR on {identifier}: {e}")
+    conn.commit()
 
     elapsed = time.monotonic() - t_start
     if verbose:
@@ -497,13 +614,18 @@ def _scrape_sequential(conn, session, identifiers, verbose):
     skipped = 0
     errors = 0
 
+    resolve_song = make_song_resolver(conn)
     t_start = time.monotonic()
     for i, identifier in enumerate(identifiers, 1):
+        if i % ARCHIVE_COMMIT_EVERY == 0:
+            conn.commit()
+            invalidate_db_songs_cache()
         elapsed = time.monotonic() - t_start
         prefix = f"  {progress_line(i, len(identifiers), elapsed)}"
 
         try:
-            release_id, track_count = scrape_item(conn, session, identifier)
+            release_id, track_count = scrape_item(conn, session, identifier,
+                                                  resolve_song=resolve_song)
             if track_count > 0:
                 total_releases += 1
                 total_tracks += track_count
@@ -518,6 +640,7 @@ def _scrape_sequential(conn, session, identifiers, verbose):
             errors += 1
             if verbose:
                 print(f"{prefix} ERROR on {identifier}: {e}")
+    conn.commit()
 
     elapsed = time.monotonic() - t_start
     if verbose:
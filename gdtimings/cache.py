@@ -1,43 +1,190 @@
-"""Shared JSON caching helpers (two-level directory, atomic writes)."""
+"""Shared JSON caching helpers (two-level directory, atomic writes).
 
-import json
+When the optional zstandard package is installed, new entries are written
+zstd-compressed as <identifier>.json.zst; plain .json entries written
+before it was installed are still read.
+"""
+
+import hashlib
 import os
-import tempfile
+import threading
 import time
 from pathlib import Path
 
+from gdtimings import json_utils
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CACHE_SUFFIX = ".json.zst" if zstandard is not None else ".json"
+# Reading a truncated or corrupt entry raises one of these
+_READ_ERRORS = (ValueError, OSError) + (
+    (zstandard.ZstdError,) if zstandard is not None else ())
+_ZSTD_LEVEL = 3
+
+# zstd contexts are not thread-safe; Phase 1 writes from many threads
+_zstd_local = threading.local()
+
+# Present in a cache_dir once its entries are in the hashed layout
+_LAYOUT_MARKER = ".layout-blake2b"
+_layout_checked = set()
+_layout_lock = threading.Lock()
+
 
 def cache_path(cache_dir, identifier):
-    """Two-level cache path: cache_dir/prefix/identifier.json"""
-    # Use first 4 chars of identifier as prefix subdirectory
-    prefix = identifier[:4] if len(identifier) >= 4 else identifier
-    return Path(cache_dir) / prefix / f"{identifier}.json"
+    """Two-level cache path: cache_dir/shard/identifier + CACHE_SUFFIX
+
+    shard is a 1-byte blake2b of the identifier in hex, spreading entries
+    over 256 directories.  (A 4-char prefix put nearly every archive.org
+    identifier under "gd19".)
+    """
+    shard = hashlib.blake2b(identifier.encode(), digest_size=1).hexdigest()
+    return Path(cache_dir) / shard / f"{identifier}{CACHE_SUFFIX}"
+
+
+def _compress(buf):
+    cctx = getattr(_zstd_local, "cctx", None)
+    if cctx is None:
+        cctx = _zstd_local.cctx = zstandard.ZstdCompressor(level=_ZSTD_LEVEL)
+    return cctx.compress(buf)
+
+
+def _decompress(buf):
+    dctx = getattr(_zstd_local, "dctx", None)
+    if dctx is None:
+        dctx = _zstd_local.dctx = zstandard.ZstdDecompressor()
+    return dctx.decompress(buf)
+
+
+def migrate_legacy_layout(cache_dir):
+    """Move entries from the old identifier[:4] layout into hash shards.
+
+    Idempotent; returns the number of files moved.
+    """
+    root = Path(cache_dir)
+    if not root.is_dir():
+        return 0
+    moved = 0
+    for sub in list(root.iterdir()):
+        if not sub.is_dir():
+            continue
+        for entry in list(sub.iterdir()):
+            if entry.suffix != ".json":
+                continue
+            # Keep the name: legacy entries are always uncompressed .json
+            dest = cache_path(cache_dir, entry.stem).with_name(entry.name)
+            if dest != entry:
+                dest.parent.mkdir(exist_ok=True)
+                os.replace(entry, dest)
+                moved += 1
+        try:
+            sub.rmdir()  # only succeeds once emptied
+        except OSError:
+            pass
+    (root / _LAYOUT_MARKER).touch()
+    return moved
+
+
+def _ensure_layout(cache_dir):
+    """Migrate a legacy cache_dir once, on first use in this process."""
+    key = str(cache_dir)
+    if key in _layout_checked:
+        return
+    with _layout_lock:
+        if key in _layout_checked:
+            return
+        if os.path.isdir(key) and not os.path.exists(os.path.join(key, _LAYOUT_MARKER)):
+            migrate_legacy_layout(cache_dir)
+        _layout_checked.add(key)
+
+
+def _is_stale(st, max_age_seconds):
+    return (max_age_seconds > 0
+            and time.time_ns() - st.st_mtime_ns > max_age_seconds * 1_000_000_000)
+
+
+def _read_compressed(path, max_age_seconds):
+    with open(path, "rb") as f:
+        if max_age_seconds > 0 and _is_stale(os.fstat(f.fileno()), max_age_seconds):
+            return None
+        return json_utils.loads(_decompress(f.read()))
 
 
 def read_cache(cache_dir, identifier, max_age_seconds=0):
     """Read cached JSON for an identifier. Returns dict or None."""
+    _ensure_layout(cache_dir)
     path = cache_path(cache_dir, identifier)
-    if not path.exists():
-        return None
-    if max_age_seconds > 0:
-        age = time.time() - path.stat().st_mtime
-        if age > max_age_seconds:
-            return None
+    # No exists() probe: a missing file surfaces as FileNotFoundError from
+    # the stat or the open, so a hit costs at most one stat.
     try:
-        return json.loads(path.read_text())
-    except (json.JSONDecodeError, OSError):
+        if zstandard is not None:
+            try:
+                return _read_compressed(path, max_age_seconds)
+            except FileNotFoundError:
+                # Written before zstandard was installed
+                path = path.with_name(f"{identifier}.json")
+        if max_age_seconds > 0 and _is_stale(os.stat(path), max_age_seconds):
+            return None
+        return json_utils.load_path(path)
+    except _READ_ERRORS:  # JSONDecodeError and bad UTF-8 are ValueErrors
         return None
 
 
+def scan_cache(cache_dir):
+    """Index the cache in one directory walk: {identifier: mtime}.
+
+    One scandir per prefix directory instead of a stat per identifier;
+    nothing is opened or parsed.
+    """
+    _ensure_layout(cache_dir)
+    index = {}
+    try:
+        prefixes = list(os.scandir(cache_dir))
+    except FileNotFoundError:
+        return index
+    for prefix in prefixes:
+        if not prefix.is_dir():
+            continue
+        with os.scandir(prefix.path) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.endswith(".json"):
+                    index[name[:-5]] = entry.stat().st_mtime
+                elif zstandard is not None and name.endswith(".json.zst"):
+                    index[name[:-9]] = entry.stat().st_mtime
+    return index
+
+
+def _write_file(path, buf):
+    """Write *buf* to a new file at *path*, looping on short writes."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(buf)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
 def write_cache(cache_dir, identifier, data):
     """Atomically write JSON to cache."""
+    _ensure_layout(cache_dir)
     path = cache_path(cache_dir, identifier)
-    path.parent.mkdir(parents=True, exist_ok=True)
-    # Atomic write: write to temp file then rename
-    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    buf = json_utils.dumps(data)
+    if zstandard is not None:
+        buf = _compress(buf)
+    # Atomic write: write to a sibling temp file then rename.  The name is
+    # unique per process and thread, so concurrent writers never share one.
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
     try:
-        with os.fdopen(fd, "w") as f:
-            json.dump(data, f)
+        try:
+            _write_file(tmp, buf)
+        except FileNotFoundError:
+            # First entry in this shard; create it only when needed
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _write_file(tmp, buf)
         os.replace(tmp, path)
     except BaseException:
         try:
@@ -45,3 +192,9 @@ def write_cache(cache_dir, identifier, data):
         except OSError:
             pass
         raise
+    if zstandard is not None:
+        # Drop an uncompressed copy from before zstandard was installed
+        try:
+            os.unlink(path.with_name(f"{identifier}.json"))
+        except FileNotFoundError:
+            pass
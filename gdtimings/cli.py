@@ -1,13 +1,10 @@
 """CLI with subcommands for the Grateful Dead timings database."""
 
 import argparse
-import csv
 import sys
 
 from gdtimings import db
-from gdtimings.analyze import (
-    classify_song_types, compute_song_stats, detect_sandwiches, print_song_summary,
-)
+from gdtimings.config import ARCHIVE_DEFAULT_WORKERS
 
 
 def cmd_scrape(args):
@@ -46,11 +43,15 @@ def cmd_scrape(args):
         if pruned:
             print(f"\n  Pruned {pruned} rare songs (< 3 tracks, not in canonical dict)")
 
+    db.refresh_planner_stats(conn)
     conn.close()
 
 
 def cmd_analyze(args):
     """Classify song types, detect sandwiches, compute statistics, and flag outliers."""
+    from gdtimings.analyze import (
+        classify_song_types, compute_song_stats, detect_sandwiches, print_song_summary,
+    )
     conn = db.get_connection()
     print("Classifying song types...")
     classify_song_types(conn)
@@ -59,6 +60,7 @@ def cmd_analyze(args):
     print("Computing song statistics...")
     compute_song_stats(conn)
     print_song_summary(conn)
+    db.refresh_planner_stats(conn)
     conn.close()
 
 
@@ -97,26 +99,21 @@ def cmd_status(args):
 def cmd_export(args):
     """Export song timings to CSV."""
     conn = db.get_connection()
-    rows = db.export_tracks(conn)
-    if not rows:
+    if conn.execute("SELECT 1 FROM tracks LIMIT 1").fetchone() is None:
         print("No data to export. Run 'scrape' first.")
         conn.close()
         return
 
-    fieldnames = rows[0].keys()
+    cursor = db.export_tracks(conn)
     out = args.output
-    if out == "-":
-        writer = csv.DictWriter(sys.stdout, fieldnames=fieldnames)
-        writer.writeheader()
-        for row in rows:
-            writer.writerow(dict(row))
-    else:
-        with open(out, "w", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            for row in rows:
-                writer.writerow(dict(row))
-        print(f"Exported {len(rows)} tracks to {out}")
+    f = sys.stdout if out == "-" else open(out, "w", newline="")
+    try:
+        count = db.write_csv(cursor, f)
+    finally:
+        if f is not sys.stdout:
+            f.close()
+    if out != "-":
+        print(f"Exported {count} tracks to {out}")
     conn.close()
 
 
@@ -124,25 +121,26 @@ def cmd_normalize(args):
     """Show unresolved or fuzzy-matched song titles."""
     conn = db.get_connection()
     if args.unmatched:
-        rows = db.unmatched_tracks(conn)
-        if rows:
-            print(f"  {len(rows)} unmatched track titles:")
-            for row in rows:
+        count = db.unmatched_title_count(conn)
+        if count:
+            print(f"  {count} unmatched track titles:")
+            for row in db.unmatched_tracks(conn):
                 print(f"    - {row['title_raw']}")
         else:
             print("  All tracks matched to songs.")
     else:
         # Show alias stats
         fuzzy = conn.execute(
-            "SELECT alias, song_id, alias_type FROM song_aliases WHERE alias_type = 'auto_fuzzy'"
+            """SELECT a.alias, s.canonical_name
+               FROM song_aliases a
+               JOIN songs s ON a.song_id = s.id
+               WHERE a.alias_type = 'auto_fuzzy'
+               ORDER BY a.alias"""
         ).fetchall()
         if fuzzy:
             print(f"  {len(fuzzy)} auto-fuzzy matches:")
             for row in fuzzy:
-                song = conn.execute(
-                    "SELECT canonical_name FROM songs WHERE id = ?", (row["song_id"],)
-                ).fetchone()
-                print(f"    '{row['alias']}' → {song['canonical_name']}")
+                print(f"    '{row['alias']}' → {row['canonical_name']}")
         else:
             print("  No fuzzy matches to review.")
     conn.close()
@@ -163,7 +161,8 @@ def main():
     p_scrape.add_argument("--full", action="store_true",
                           help="Re-scrape everything (ignore prior state)")
     p_scrape.add_argument("--workers", type=int, default=None,
-                          help="Number of parallel fetch workers (default: 8)")
+                          help="Number of parallel archive.org fetch workers "
+                               f"(default: {ARCHIVE_DEFAULT_WORKERS})")
     p_scrape.add_argument("--no-cache", action="store_true",
                           help="Disable local JSON cache (sequential fetching)")
     p_scrape.add_argument("--max-age", type=int, default=0,
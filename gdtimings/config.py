@@ -1,6 +1,7 @@
 """Constants, thresholds, and API URLs."""
 
 import os
+from types import MappingProxyType
 
 # ── Paths ──────────────────────────────────────────────────────────────
 DB_DIR = os.path.expanduser("~/.gdtimings")
@@ -32,17 +33,18 @@ WIKIPEDIA_CATEGORIES = [
 
 # Default coverage by Wikipedia category (used for release discovery and
 # coverage metadata; MusicBrainz is the authoritative timing source).
-CATEGORY_COVERAGE = {
+CATEGORY_COVERAGE = MappingProxyType({
     "Category:Dick's Picks albums": "complete",
     "Category:Dave's Picks albums": "complete",
     "Category:Road Trips albums": "unedited",
     "Category:Grateful Dead Download Series": "complete",
     "Category:Grateful Dead live albums": "unknown",
-}
+})
 
 # Overrides for specific releases in the catch-all "live albums" category.
-# Page title (exact Wikipedia article title) → coverage.
-RELEASE_COVERAGE_OVERRIDES = {
+# Page title (exact Wikipedia article title) → coverage.  Both coverage
+# tables are read-only views so a scraper cannot mutate the shared defaults.
+RELEASE_COVERAGE_OVERRIDES = MappingProxyType({
     # ── Complete unedited shows ──────────────────────────────────────
     "One from the Vault": "complete",
     "Two from the Vault": "complete",
@@ -88,11 +90,28 @@ RELEASE_COVERAGE_OVERRIDES = {
     "The Grateful Dead Movie Soundtrack": "edited",
     "Ready or Not (Grateful Dead album)": "edited",
     "Go to Nassau": "unedited",  # only Drums is edited
-}
+})
+
+
+def coverage_for(category, page_title):
+    """Coverage tier for a Wikipedia release.
+
+    A per-release override takes priority, then the category default.
+    """
+    coverage = RELEASE_COVERAGE_OVERRIDES.get(page_title)
+    if coverage is None:
+        coverage = CATEGORY_COVERAGE.get(category, "unknown")
+    return coverage
 
 # ── MusicBrainz (authoritative timing source for official releases) ───
 MUSICBRAINZ_ARTIST_ID = "6faa7ca7-0d99-4a5e-bfa6-1fd5037520c6"  # Grateful Dead
 MUSICBRAINZ_RATE_LIMIT = 1.0  # seconds between requests (MB policy)
+MUSICBRAINZ_API = "https://musicbrainz.org/ws/2"
+MUSICBRAINZ_USER_AGENT = "GDTimingsBot/1.0 ( https://github.com/gdtimings )"
+MUSICBRAINZ_FETCH_WORKERS = 4  # threads fetching ahead of the DB writer
+MUSICBRAINZ_CACHE_DIR = os.path.join(DB_DIR, "cache_musicbrainz")
+# Series and release-group listings change rarely; re-fetch them daily
+MUSICBRAINZ_LISTING_MAX_AGE = 24 * 3600  # seconds
 
 # Series MBIDs for systematic enumeration of official releases.
 # All are release group series on MusicBrainz.
@@ -129,6 +148,8 @@ ARCHIVE_SCRAPE_URL = "https://archive.org/services/search/v1/scrape"
 ARCHIVE_METADATA_URL = "https://archive.org/metadata/{identifier}"
 ARCHIVE_USER_AGENT = "GDTimingsBot/1.0 (Grateful Dead song timings research)"
 ARCHIVE_RATE_LIMIT = 0.0  # seconds between requests (IA allows 500/s)
+ARCHIVE_COMMIT_EVERY = 500  # releases per transaction when loading the cache
+ARCHIVE_READ_WORKERS = 4  # processes parsing cache files ahead of the DB writer
 
 # ── Quality ranking ────────────────────────────────────────────────────
 QUALITY_RANKS = {
@@ -1,11 +1,17 @@
 """SQLite schema, connection, and all DB operations."""
 
+import csv
 import os
 import sqlite3
+from contextlib import contextmanager
 from datetime import datetime, timezone
 
 from gdtimings.config import DB_PATH
 
+# Stored in PRAGMA user_version once SCHEMA has been applied.  Bump it
+# whenever SCHEMA changes so existing databases pick the change up.
+SCHEMA_VERSION = 1
+
 SCHEMA = """
 CREATE TABLE IF NOT EXISTS songs (
     id              INTEGER PRIMARY KEY,
@@ -69,6 +75,15 @@ CREATE TABLE IF NOT EXISTS tracks (
     UNIQUE(release_id, disc_number, track_number)
 );
 CREATE INDEX IF NOT EXISTS idx_tracks_song ON tracks(song_id);
+-- Timed tracks only: drives the *_performances views and analyze's _PER_SHOW_SQL
+CREATE INDEX IF NOT EXISTS idx_tracks_song_dur
+    ON tracks(song_id, duration_seconds) WHERE duration_seconds IS NOT NULL;
+-- Covers the per-show aggregation in analyze.py without touching the table
+CREATE INDEX IF NOT EXISTS idx_tracks_song_release
+    ON tracks(song_id, release_id, duration_seconds, sandwich_duration);
+-- Covers the ordered per-release walk in detect_sandwiches()
+CREATE INDEX IF NOT EXISTS idx_tracks_release_order
+    ON tracks(release_id, disc_number, track_number, id, song_id, duration_seconds);
 
 CREATE TABLE IF NOT EXISTS scrape_state (
     key   TEXT PRIMARY KEY,
@@ -129,14 +144,89 @@ def get_connection(db_path=None):
     path = db_path or DB_PATH
     if path != ":memory:":
         os.makedirs(os.path.dirname(path), exist_ok=True)
-    conn = sqlite3.connect(path)
+    # Analysis passes reuse a handful of fixed statements; keep them prepared
+    conn = sqlite3.connect(path, cached_statements=512)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA journal_mode=WAL")
+    # WAL + NORMAL only fsyncs at checkpoints, not on every commit
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-131072")  # 128 MiB page cache
+    conn.execute("PRAGMA mmap_size=268435456")  # read pages via 256 MiB mmap
+    # Checkpoint every ~40 MB of WAL instead of ~4 MB during bulk scrapes
+    conn.execute("PRAGMA wal_autocheckpoint=10000")
     conn.execute("PRAGMA foreign_keys=ON")
-    conn.executescript(SCHEMA)
+    if _ensure_schema(conn):
+        conn.execute("ANALYZE")
     return conn
 
 
+def _ensure_schema(conn):
+    """Apply SCHEMA unless this database is already at SCHEMA_VERSION.
+
+    Every statement in SCHEMA is IF NOT EXISTS, so re-applying it to an
+    older database only adds what is missing.  Returns True if the schema
+    was applied, False if the database was already current.
+    """
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return False
+    conn.executescript(SCHEMA)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return True
+
+
+def refresh_planner_stats(conn):
+    """Keep sqlite_stat1 current so the planner picks the covering indexes.
+
+    Call once at the end of a command that wrote data (scrape, analyze);
+    it may need the write lock, so it is not run on connect.  A full
+    ANALYZE runs until tracks has statistics (empty tables get no stat
+    rows); after that PRAGMA optimize re-analyzes only tables that
+    changed a lot.
+    """
+    has_stats = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+    ).fetchone() and conn.execute(
+        "SELECT 1 FROM sqlite_stat1 WHERE tbl = 'tracks' LIMIT 1"
+    ).fetchone()
+    if has_stats:
+        conn.execute("PRAGMA optimize=0x10002")
+    else:
+        conn.execute("ANALYZE")
+
+
+@contextmanager
+def transaction(conn):
+    """Run the enclosed block as a single write transaction.
+
+    Takes the write lock up front (BEGIN IMMEDIATE), commits on success and
+    rolls back if the block raises.  Any transaction the caller left open
+    is committed first, matching the commit-at-end behavior of the passes
+    that use this.
+    """
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+def execute_tuples(conn, sql, params=()):
+    """Execute *sql* on a cursor that yields plain tuples, not sqlite3.Row.
+
+    For bulk reads that unpack positionally, where Row's by-name lookup
+    is pure overhead.
+    """
+    cur = conn.cursor()
+    cur.row_factory = None
+    return cur.execute(sql, params)
+
+
 # ── Scrape state ───────────────────────────────────────────────────────
 
 def get_scrape_state(conn, key):
@@ -155,6 +245,9 @@ def set_scrape_state(conn, key, value):
 
 # ── Releases ───────────────────────────────────────────────────────────
 
+# RETURNING needs SQLite 3.35+; older libraries use SELECT-then-INSERT
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
 def release_exists(conn, source_id):
     row = conn.execute(
         "SELECT id FROM releases WHERE source_id = ?", (source_id,)
@@ -162,6 +255,34 @@ def release_exists(conn, source_id):
     return row["id"] if row else None
 
 
+def existing_source_ids(conn, source_ids, chunk_size=500):
+    """Return the subset of *source_ids* that already have a release row.
+
+    Checks in chunks of IN (...) queries rather than one lookup per id,
+    keeping each statement under SQLite's bound-parameter limit.
+    """
+    source_ids = list(source_ids)
+    found = set()
+    for i in range(0, len(source_ids), chunk_size):
+        chunk = source_ids[i:i + chunk_size]
+        placeholders = ",".join("?" * len(chunk))
+        found.update(
+            row[0] for row in conn.execute(
+                f"SELECT source_id FROM releases WHERE source_id IN ({placeholders})",
+                chunk,
+            )
+        )
+    return found
+
+
+def musicbrainz_release_mbids(conn):
+    """Release MBIDs that already have rows (source_id "mb:<mbid>:<date>")."""
+    return {
+        row[0].split(":", 2)[1] for row in conn.execute(
+            "SELECT source_id FROM releases WHERE source_id LIKE 'mb:%'")
+    }
+
+
 def _parse_date_parts(concert_date):
     """Extract (year, month, day) integers from an ISO date string."""
     if not concert_date:
@@ -173,28 +294,54 @@ def _parse_date_parts(concert_date):
     return None, None, None
 
 
-def insert_release(conn, *, source_type, source_id, title=None, concert_date=None,
-                   venue=None, city=None, state=None, coverage=None,
-                   recording_type="official", quality_rank=500, release_date=None,
-                   label=None, source_url=None, taper=None, lineage=None,
-                   source_detail=None):
-    now = datetime.now(timezone.utc).isoformat()
-    concert_year, concert_month, concert_day = _parse_date_parts(concert_date)
-    cur = conn.execute(
-        """INSERT INTO releases
+_INSERT_RELEASE_SQL = """INSERT INTO releases
            (source_type, source_id, title, concert_date, concert_year,
             concert_month, concert_day, venue, city, state, coverage,
             recording_type, quality_rank, release_date, label, source_url,
             taper, lineage, source_detail, scraped_at)
-           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-        (source_type, source_id, title, concert_date, concert_year,
-         concert_month, concert_day, venue, city, state, coverage,
-         recording_type, quality_rank, release_date, label, source_url,
-         taper, lineage, source_detail, now),
-    )
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+# Yields the new id, or no row when source_id is already taken
+_INSERT_RELEASE_IF_NEW_SQL = (
+    _INSERT_RELEASE_SQL + " ON CONFLICT(source_id) DO NOTHING RETURNING id"
+)
+
+
+def _release_params(source_type, source_id, title=None, concert_date=None,
+                    venue=None, city=None, state=None, coverage=None,
+                    recording_type="official", quality_rank=500, release_date=None,
+                    label=None, source_url=None, taper=None, lineage=None,
+                    source_detail=None):
+    now = datetime.now(timezone.utc).isoformat()
+    concert_year, concert_month, concert_day = _parse_date_parts(concert_date)
+    return (source_type, source_id, title, concert_date, concert_year,
+            concert_month, concert_day, venue, city, state, coverage,
+            recording_type, quality_rank, release_date, label, source_url,
+            taper, lineage, source_detail, now)
+
+
+def insert_release(conn, *, source_type, source_id, **fields):
+    cur = conn.execute(_INSERT_RELEASE_SQL,
+                       _release_params(source_type, source_id, **fields))
     return cur.lastrowid
 
 
+def insert_release_if_new(conn, *, source_type, source_id, **fields):
+    """Insert a release unless source_id exists; return the new id or None.
+
+    One statement instead of release_exists() followed by insert_release(),
+    for callers that already have the release data in hand.
+    """
+    if not _HAS_RETURNING:
+        if release_exists(conn, source_id):
+            return None
+        return insert_release(conn, source_type=source_type,
+                              source_id=source_id, **fields)
+    row = conn.execute(_INSERT_RELEASE_IF_NEW_SQL,
+                       _release_params(source_type, source_id, **fields)).fetchone()
+    return row[0] if row else None
+
+
 def update_release(conn, release_id, **fields):
     if not fields:
         return
@@ -207,7 +354,20 @@ def update_release(conn, release_id, **fields):
 
 # ── Songs ──────────────────────────────────────────────────────────────
 
+# DO NOTHING leaves an existing row untouched (no rewrite, no WAL frame);
+# RETURNING then yields nothing and the id comes from a plain SELECT.
+_INSERT_SONG_IF_NEW_SQL = """
+    INSERT INTO songs (canonical_name) VALUES (?)
+    ON CONFLICT(canonical_name) DO NOTHING
+    RETURNING id
+"""
+
+
 def get_or_create_song(conn, canonical_name):
+    if _HAS_RETURNING:
+        row = conn.execute(_INSERT_SONG_IF_NEW_SQL, (canonical_name,)).fetchone()
+        if row:
+            return row[0]
     row = conn.execute(
         "SELECT id FROM songs WHERE canonical_name = ?", (canonical_name,)
     ).fetchone()
@@ -226,83 +386,148 @@ def get_song_by_alias(conn, alias):
     return row["song_id"] if row else None
 
 
+def get_song_and_name_by_alias(conn, alias):
+    """Return (song_id, canonical_name) for an alias, or None, in one query."""
+    return execute_tuples(
+        conn,
+        """SELECT s.id, s.canonical_name
+           FROM song_aliases a
+           JOIN songs s ON s.id = a.song_id
+           WHERE a.alias = ?""",
+        (alias,),
+    ).fetchone()
+
+
+_INSERT_ALIAS_SQL = (
+    "INSERT OR IGNORE INTO song_aliases (alias, song_id, alias_type) VALUES (?, ?, ?)"
+)
+
+
 def add_alias(conn, alias, song_id, alias_type="variant"):
-    conn.execute(
-        "INSERT OR IGNORE INTO song_aliases (alias, song_id, alias_type) VALUES (?, ?, ?)",
-        (alias, song_id, alias_type),
-    )
+    conn.execute(_INSERT_ALIAS_SQL, (alias, song_id, alias_type))
+
+
+def add_aliases_many(conn, rows):
+    """Insert many aliases with one executemany.
+
+    rows: iterable of (alias, song_id, alias_type).
+    """
+    conn.executemany(_INSERT_ALIAS_SQL, rows)
 
 
 # ── Tracks ─────────────────────────────────────────────────────────────
 
+_INSERT_TRACK_SQL = """
+    INSERT OR REPLACE INTO tracks
+    (release_id, song_id, title_raw, disc_number, track_number,
+     set_name, duration_seconds, writers, segue)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
 def insert_track(conn, *, release_id, title_raw, disc_number=1, track_number,
                  song_id=None, set_name=None, duration_seconds=None,
                  writers=None, segue=0):
     conn.execute(
-        """INSERT OR REPLACE INTO tracks
-           (release_id, song_id, title_raw, disc_number, track_number,
-            set_name, duration_seconds, writers, segue)
-           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        _INSERT_TRACK_SQL,
         (release_id, song_id, title_raw, disc_number, track_number,
          set_name, duration_seconds, writers, segue),
     )
 
 
-def get_tracks_for_song(conn, song_id):
-    return conn.execute(
-        "SELECT * FROM tracks WHERE song_id = ? AND duration_seconds IS NOT NULL",
-        (song_id,),
-    ).fetchall()
+def insert_tracks_many(conn, rows):
+    """Insert many tracks with one executemany.
+
+    rows: iterable of (release_id, song_id, title_raw, disc_number,
+    track_number, set_name, duration_seconds, writers, segue).
+    """
+    conn.executemany(_INSERT_TRACK_SQL, rows)
 
 
 # ── Stats / queries ───────────────────────────────────────────────────
 
+# The listing helpers return the cursor so callers stream the rows
 def all_songs(conn):
-    return conn.execute("SELECT * FROM songs ORDER BY canonical_name").fetchall()
+    return conn.execute("SELECT * FROM songs ORDER BY canonical_name")
 
 
 def all_releases(conn):
-    return conn.execute("SELECT * FROM releases ORDER BY concert_date").fetchall()
+    return conn.execute("SELECT * FROM releases ORDER BY concert_date")
+
+
+_DB_STATS_SQL = """
+SELECT (SELECT COUNT(*) FROM songs) AS songs,
+       (SELECT COUNT(*) FROM releases) AS releases,
+       (SELECT COUNT(*) FROM song_aliases) AS song_aliases,
+       COUNT(*) AS tracks,
+       COUNT(duration_seconds) AS tracks_with_duration,
+       COALESCE(SUM(song_id IS NULL), 0) AS unmatched_tracks
+FROM tracks
+"""
 
 
 def db_stats(conn):
-    stats = {}
-    for table in ("songs", "releases", "tracks", "song_aliases"):
-        row = conn.execute(f"SELECT COUNT(*) AS n FROM {table}").fetchone()
-        stats[table] = row["n"]
-    stats["tracks_with_duration"] = conn.execute(
-        "SELECT COUNT(*) AS n FROM tracks WHERE duration_seconds IS NOT NULL"
-    ).fetchone()["n"]
-    stats["unmatched_tracks"] = conn.execute(
-        "SELECT COUNT(*) AS n FROM tracks WHERE song_id IS NULL"
-    ).fetchone()["n"]
-    return stats
+    # One statement; the three track counts share a single pass over tracks
+    row = conn.execute(_DB_STATS_SQL).fetchone()
+    return dict(zip(row.keys(), row))
 
 
 def unmatched_tracks(conn):
     return conn.execute(
         """SELECT DISTINCT title_raw FROM tracks
            WHERE song_id IS NULL ORDER BY title_raw"""
-    ).fetchall()
+    )
+
+
+def unmatched_title_count(conn):
+    """Number of rows unmatched_tracks() will yield."""
+    return conn.execute(
+        "SELECT COUNT(DISTINCT title_raw) FROM tracks WHERE song_id IS NULL"
+    ).fetchone()[0]
+
+
+_UPDATE_SONG_STATS_SQL = """UPDATE songs SET times_played=?, median_duration=?, mean_duration=?,
+           std_duration=?, first_played=?, last_played=?
+           WHERE id=?"""
+
+_MARK_OUTLIER_SQL = "UPDATE tracks SET is_outlier = ? WHERE id = ?"
 
 
 def update_song_stats(conn, song_id, *, times_played, median_duration,
                       mean_duration, std_duration, first_played, last_played):
     conn.execute(
-        """UPDATE songs SET times_played=?, median_duration=?, mean_duration=?,
-           std_duration=?, first_played=?, last_played=?
-           WHERE id=?""",
+        _UPDATE_SONG_STATS_SQL,
         (times_played, median_duration, mean_duration, std_duration,
          first_played, last_played, song_id),
     )
 
 
+def update_song_stats_many(conn, rows):
+    """Batch form of update_song_stats.
+
+    rows: iterable of (times_played, median_duration, mean_duration,
+    std_duration, first_played, last_played, song_id) tuples.
+    """
+    conn.executemany(_UPDATE_SONG_STATS_SQL, rows)
+
+
 def mark_outlier(conn, track_id, is_outlier=1):
-    conn.execute("UPDATE tracks SET is_outlier = ? WHERE id = ?", (is_outlier, track_id))
+    conn.execute(_MARK_OUTLIER_SQL, (is_outlier, track_id))
+
+
+def mark_outliers(conn, rows):
+    """Batch form of mark_outlier.  rows: iterable of (is_outlier, track_id)."""
+    conn.executemany(_MARK_OUTLIER_SQL, rows)
 
 
 def export_tracks(conn):
-    return conn.execute(
+    """Return a cursor over every track joined to its release and song.
+
+    Rows are plain tuples (column names are in ``cursor.description``) so
+    the CSV export can stream them straight to the writer.
+    """
+    return execute_tuples(
+        conn,
         """SELECT s.canonical_name AS song, s.song_type, t.duration_seconds,
                   t.disc_number, t.track_number, t.set_name, t.writers,
                   t.segue, t.is_outlier,
@@ -313,4 +538,25 @@ def export_tracks(conn):
            JOIN releases r ON t.release_id = r.id
            LEFT JOIN songs s ON t.song_id = s.id
            ORDER BY s.canonical_name, r.concert_date""",
-    ).fetchall()
+    )
+
+
+# Rows fetched from SQLite per CSV write
+_EXPORT_BATCH = 1000
+
+
+def write_csv(cursor, fh):
+    """Write *cursor*'s header and rows to *fh* as CSV; return the row count.
+
+    Rows are fetched in batches of ``_EXPORT_BATCH`` so memory stays flat
+    however large the DB is.
+    """
+    writer = csv.writer(fh)
+    writer.writerow([col[0] for col in cursor.description])
+    count = 0
+    batch = cursor.fetchmany(_EXPORT_BATCH)
+    while batch:
+        writer.writerows(batch)
+        count += len(batch)
+        batch = cursor.fetchmany(_EXPORT_BATCH)
+    return count
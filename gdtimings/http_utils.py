@@ -1,43 +1,158 @@
 """Shared HTTP utilities for scrapers."""
 
+import random
+import threading
 import time
 
 import requests
+from requests.adapters import HTTPAdapter
 
+from gdtimings import json_utils
 
-def create_session(user_agent):
-    """Create a requests.Session with a User-Agent header."""
+
+def create_session(user_agent, pool_size=None):
+    """Create a requests.Session with a User-Agent header.
+
+    pool_size: keep up to this many connections per host alive.  Set it to
+    the worker count when one session is shared across a thread pool, so
+    threads reuse sockets (and TLS sessions) instead of reconnecting past
+    the default pool of 10.
+    """
     s = requests.Session()
     s.headers["User-Agent"] = user_agent
+    if pool_size:
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        s.mount("https://", adapter)
+        s.mount("http://", adapter)
     return s
 
 
-def api_get_with_retry(session, url, params=None, rate_limit=0.5, max_retries=3):
+# Backoff when the server gives no Retry-After: 1s, 2s, 4s ... up to the cap
+_BACKOFF_BASE = 1.0
+_BACKOFF_CAP = 30.0
+
+
+def _retry_delay(resp, attempt):
+    """Seconds to wait before retrying a 429/5xx response.
+
+    Honours a numeric Retry-After.  Otherwise backs off exponentially with
+    up to 50% random jitter, so workers that were throttled together do
+    not all retry at the same instant.
+    """
+    retry_after = resp.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass  # HTTP-date form; fall back to backoff
+    delay = min(_BACKOFF_CAP, _BACKOFF_BASE * 2 ** attempt)
+    return delay * (1 + random.random() * 0.5)
+
+
+# Pause when a server reports fewer requests than this left in its window
+_QUOTA_LOW = 2
+
+
+def _quota_wait(resp):
+    """Seconds until the server's rate-limit window resets, if nearly spent.
+
+    Reads X-RateLimit-Remaining / X-RateLimit-Reset (sent by MusicBrainz
+    among others); returns 0 when they are absent or quota remains.
+    """
+    remaining = resp.headers.get("X-RateLimit-Remaining")
+    reset = resp.headers.get("X-RateLimit-Reset")
+    if remaining is None or reset is None:
+        return 0.0
+    try:
+        if int(remaining) >= _QUOTA_LOW:
+            return 0.0
+        reset = float(reset)
+    except ValueError:
+        return 0.0
+    # Usually a Unix timestamp; some servers send seconds from now
+    wait = reset - time.time() if reset > 1e9 else reset
+    return min(max(0.0, wait), _BACKOFF_CAP)
+
+
+class TokenBucket:
+    """Thread-safe token bucket for pacing requests across a worker pool.
+
+    Allows *rate* requests per second on average over all threads that
+    share it, with bursts of up to *burst*.  Unlike a sleep after each
+    request, N workers together hold the rate instead of multiplying it.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.capacity = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity,
+                                   self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def hold(self, seconds):
+        """Make every thread's next acquire() wait at least *seconds*."""
+        with self._lock:
+            self._tokens = min(self._tokens, 1 - seconds * self.rate)
+
+
+def _pace(resp, rate_limit, limiter):
+    """Wait after a successful response, longer if the server's quota is low."""
+    wait = _quota_wait(resp)
+    if limiter:
+        if wait:
+            limiter.hold(wait)
+    else:
+        time.sleep(max(rate_limit, wait))
+
+
+def api_get_with_retry(session, url, params=None, rate_limit=0.5, max_retries=3,
+                       limiter=None):
     """Make an API request with rate limiting and retry on 429/5xx.
 
     Args:
         session: requests.Session to use
         url: Request URL
         params: Optional query parameters
-        rate_limit: Seconds to wait between successful requests
+        rate_limit: Seconds to wait between successful requests; longer
+            if X-RateLimit headers say the server's quota is nearly spent
         max_retries: Number of retry attempts before a final raise
+        limiter: Optional shared TokenBucket; when given, a token is taken
+            before each send and rate_limit is ignored
     """
     for attempt in range(max_retries):
+        if limiter:
+            limiter.acquire()
         resp = session.get(url, params=params)
         if resp.status_code == 429 or resp.status_code >= 500:
-            retry_after = int(resp.headers.get("Retry-After", 2 ** attempt))
-            print(f"    HTTP {resp.status_code}, retrying in {retry_after}s "
+            delay = _retry_delay(resp, attempt)
+            print(f"    HTTP {resp.status_code}, retrying in {delay:.1f}s "
                   f"(attempt {attempt + 1}/{max_retries})")
-            time.sleep(retry_after)
+            time.sleep(delay)
             continue
         resp.raise_for_status()
-        time.sleep(rate_limit)
-        return resp.json()
+        _pace(resp, rate_limit, limiter)
+        return json_utils.loads(resp.content)
     # Final attempt — let it raise
+    if limiter:
+        limiter.acquire()
     resp = session.get(url, params=params)
     resp.raise_for_status()
-    time.sleep(rate_limit)
-    return resp.json()
+    _pace(resp, rate_limit, limiter)
+    return json_utils.loads(resp.content)
 
 
 def progress_line(done, total, elapsed):
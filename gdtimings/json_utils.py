@@ -0,0 +1,54 @@
+"""JSON encode/decode on UTF-8 bytes, using orjson when it is installed.
+
+Cache files and API responses go through here so the faster parser is
+picked up in one place.  orjson is optional; without it the stdlib json
+module is used behind the same bytes-in/bytes-out API.
+"""
+
+import json
+import mmap
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+if orjson is not None:
+    def loads(data):
+        """Parse JSON from bytes/str."""
+        return orjson.loads(data)
+
+    def dumps(obj):
+        """Serialize *obj* to compact UTF-8 JSON bytes."""
+        # NON_STR_KEYS: stringify int keys like the stdlib does
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+else:
+    def loads(data):
+        """Parse JSON from bytes/str."""
+        return json.loads(data)
+
+    def dumps(obj):
+        """Serialize *obj* to compact UTF-8 JSON bytes."""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+# Below this, mmap setup costs more than the copy it saves
+_MMAP_MIN_BYTES = 64 * 1024
+
+
+def load_path(path):
+    """Parse a JSON file.
+
+    With orjson, large files are parsed straight out of a read-only memory
+    map instead of being copied into a bytes object first.
+    """
+    with open(path, "rb") as f:
+        if orjson is None or os.fstat(f.fileno()).st_size < _MMAP_MIN_BYTES:
+            return loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, "madvise"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            with memoryview(mm) as view:
+                return orjson.loads(view)
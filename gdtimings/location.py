@@ -1,5 +1,7 @@
 """Shared location parsing for venue/city/state extraction."""
 
+import functools
+
 # 50 US states + DC: abbreviation → full name
 US_STATE_ABBREV = {
     "AL": "Alabama", "AK": "Alaska", "AZ": "Arizona", "AR": "Arkansas",
@@ -17,9 +19,6 @@ US_STATE_ABBREV = {
     "WI": "Wisconsin", "WY": "Wyoming", "DC": "District of Columbia",
 }
 
-# Reverse lookup: full name → full name (for pass-through)
-_FULL_STATE_NAMES = {v: v for v in US_STATE_ABBREV.values()}
-
 # Informal abbreviations (uppercase, no dots) → full name
 _INFORMAL_ABBREV = {
     "MASS": "Massachusetts",
@@ -32,6 +31,18 @@ _INFORMAL_ABBREV = {
     "WISC": "Wisconsin",
 }
 
+# Uppercase state names and postal abbreviations: is_us_state() matches these
+_US_STATE_KEYS = frozenset(US_STATE_ABBREV) | frozenset(
+    name.upper() for name in US_STATE_ABBREV.values())
+
+# Everything normalize_state() recognizes, keyed uppercase without dots:
+# postal and informal abbreviations and full names, → full name
+_STATE_LOOKUP = {
+    **{name.upper(): name for name in US_STATE_ABBREV.values()},
+    **_INFORMAL_ABBREV,
+    **US_STATE_ABBREV,
+}
+
 
 def normalize_state(raw):
     """Convert state abbreviation to full name, or pass through full names.
@@ -45,30 +56,18 @@ def normalize_state(raw):
     raw = raw.strip().rstrip(".,")
     if not raw:
         return None
-    upper = raw.upper()
-    if upper in US_STATE_ABBREV:
-        return US_STATE_ABBREV[upper]
-    if raw in _FULL_STATE_NAMES:
-        return raw
-    # Handle dotted abbreviations: "R.I." → "RI", "D.C." → "DC", "N.J." → "NJ"
-    nodots = upper.replace(".", "")
-    if nodots in US_STATE_ABBREV:
-        return US_STATE_ABBREV[nodots]
-    # Handle common informal abbreviations
-    if nodots in _INFORMAL_ABBREV:
-        return _INFORMAL_ABBREV[nodots]
-    # Non-US or unrecognized — pass through as-is
-    return raw
+    # One probe covers "CA", "California", "R.I." → "RI" and "Mass"
+    return _STATE_LOOKUP.get(raw.upper().replace(".", ""), raw)
 
 
 def is_us_state(text):
     """Return True if text is a US state name or abbreviation."""
     if not text:
         return False
-    text = text.strip()
-    return text.upper() in US_STATE_ABBREV or text in _FULL_STATE_NAMES
+    return text.strip().upper() in _US_STATE_KEYS
 
 
+@functools.lru_cache(maxsize=2048)
 def parse_city_state(text):
     """Split 'City, State' into (city, state_full_name).
 
@@ -81,6 +80,7 @@ def parse_city_state(text):
         ""                       → (None, None)
 
     Returns (city, state) tuple. State is normalized to full name for US states.
+    Memoized: the same venue strings recur across hundreds of recordings.
     """
     if not text or not text.strip():
         return None, None
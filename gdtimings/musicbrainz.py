@@ -12,168 +12,260 @@ Pipeline:
 5. Insert tracks with MusicBrainz durations
 """
 
+import functools
+import itertools
 import re
-import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 
-import musicbrainzngs
+import requests
 
 from gdtimings import db
+from gdtimings.cache import read_cache, write_cache
 from gdtimings.config import (
+    MUSICBRAINZ_API,
+    MUSICBRAINZ_CACHE_DIR,
+    MUSICBRAINZ_FETCH_WORKERS,
+    MUSICBRAINZ_LISTING_MAX_AGE,
     MUSICBRAINZ_RATE_LIMIT,
     MUSICBRAINZ_SERIES_COVERAGE,
     MUSICBRAINZ_SERIES_IDS,
     MUSICBRAINZ_STANDALONE_RELEASES,
+    MUSICBRAINZ_USER_AGENT,
 )
-from gdtimings.normalize import normalize_song
+from gdtimings.http_utils import TokenBucket, api_get_with_retry, create_session
+from gdtimings.normalize import invalidate_db_songs_cache, make_song_resolver
 
-# Set up the client once at import time
-musicbrainzngs.set_useragent(
-    "GDTimingsBot", "1.0", "https://github.com/gdtimings"
-)
+# One keep-alive session for every call to the web service (ws/2, JSON)
+_SESSION = create_session(MUSICBRAINZ_USER_AGENT)
+
+# Shared by the fetch threads so together they hold MB's 1 req/s policy
+_LIMITER = (TokenBucket(1 / MUSICBRAINZ_RATE_LIMIT)
+            if MUSICBRAINZ_RATE_LIMIT > 0 else None)
 
 
-def _rate_limit():
-    """Sleep to respect MusicBrainz rate limit."""
-    if MUSICBRAINZ_RATE_LIMIT > 0:
-        time.sleep(MUSICBRAINZ_RATE_LIMIT)
+def _mb_get(path, **params):
+    """GET a ws/2 resource as JSON, paced by the shared rate limiter."""
+    params["fmt"] = "json"
+    return api_get_with_retry(_SESSION, f"{MUSICBRAINZ_API}/{path}", params=params,
+                              rate_limit=0, limiter=_LIMITER)
+
+
+def _mb_get_listing(cache_key, path, **params):
+    """_mb_get() for a series/release-group listing, cached on disk.
+
+    Listings rarely change, so a cached copy younger than
+    MUSICBRAINZ_LISTING_MAX_AGE is used without asking MusicBrainz.
+    Release details are not cached, so edits to them are picked up.
+    """
+    data = read_cache(MUSICBRAINZ_CACHE_DIR, cache_key, MUSICBRAINZ_LISTING_MAX_AGE)
+    if data is None:
+        data = _mb_get(path, **params)
+        write_cache(MUSICBRAINZ_CACHE_DIR, cache_key, data)
+    return data
 
 
 # ── Date parsing ──────────────────────────────────────────────────────
 
-# Patterns for dates in media titles, e.g.:
+# Dates in media titles, e.g.:
 #   "P.N.E. Coliseum -- Vancouver, B.C., Canada - 6/22/73"
 #   "Boston Music Hall, Boston, MA 6/9/76"
 #   "12/31/78"
 #   "1974-05-21"
-_DATE_PATTERNS = [
-    # ISO: 1974-05-21
-    re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})'),
-    # US: 6/22/73 or 12/31/1978
-    re.compile(r'(\d{1,2})/(\d{1,2})/(\d{2,4})'),
-]
+# Both forms in one alternation, so a title is scanned once.
+_DATE_RE = re.compile(
+    r'(?P<iso_y>\d{4})-(?P<iso_m>\d{1,2})-(?P<iso_d>\d{1,2})'  # ISO: 1974-05-21
+    r'|(?P<us_m>\d{1,2})/(?P<us_d>\d{1,2})/(?P<us_y>\d{2,4})'  # US: 6/22/73, 12/31/1978
+)
 
 
+# Days per month, index 1-12 (Feb allows 29; leap years aren't checked)
+_MONTH_DAYS = (0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def _checked_date(year, month, day):
+    """ISO date string, or None unless a plausible GD-era calendar date."""
+    if 1965 <= year <= 1995 and 1 <= month <= 12 and 1 <= day <= _MONTH_DAYS[month]:
+        return f"{year:04d}-{month:02d}-{day:02d}"
+    return None
+
+
+@functools.lru_cache(maxsize=8192)
 def parse_date_from_title(title):
     """Extract a concert date (YYYY-MM-DD) from a media/disc title.
 
-    Returns None if no date is found.
+    The first ISO date wins over any US-style date; otherwise the first
+    US-style date is used.  Returns None if no date is found.
+    Memoized: disc titles repeat across the releases of a series.
     """
-    if not title:
+    # Most disc titles ("Disc 1") have neither separator; skip the regex
+    if not title or ("/" not in title and "-" not in title):
         return None
 
-    for pat in _DATE_PATTERNS:
-        m = pat.search(title)
-        if not m:
-            continue
-
-        groups = m.groups()
-        if '-' in m.group(0):
-            # ISO format: YYYY-MM-DD
-            year, month, day = int(groups[0]), int(groups[1]), int(groups[2])
-        else:
-            # US format: M/D/YY or M/D/YYYY
-            month, day, year = int(groups[0]), int(groups[1]), int(groups[2])
-            if year < 100:
-                year += 1900 if year >= 60 else 2000
-
-        if 1965 <= year <= 1995 and 1 <= month <= 12 and 1 <= day <= 31:
-            return f"{year:04d}-{month:02d}-{day:02d}"
-
-    return None
+    us = None
+    iso_seen = False
+    for m in _DATE_RE.finditer(title):
+        if m["iso_y"] is not None:
+            if iso_seen:
+                continue
+            iso_seen = True
+            date = _checked_date(int(m["iso_y"]), int(m["iso_m"]), int(m["iso_d"]))
+            if date:
+                return date
+            if us:
+                break
+        elif us is None:
+            us = m
+            if iso_seen:
+                break
+
+    if us is None:
+        return None
+    # US format: M/D/YY or M/D/YYYY
+    year = int(us["us_y"])
+    if year < 100:
+        year += 1900 if year >= 60 else 2000
+    return _checked_date(year, int(us["us_m"]), int(us["us_d"]))
 
 
 # ── Series enumeration ────────────────────────────────────────────────
 
 def _get_release_details(release_mbid):
     """Fetch full release details including media, tracks, and recordings."""
-    _rate_limit()
-    return musicbrainzngs.get_release_by_id(
-        release_mbid,
-        includes=["recordings", "media"],
-    )["release"]
+    return _mb_get(f"release/{release_mbid}", inc="recordings+media")
 
 
 def _get_releases_for_release_group(rg_mbid):
     """Get all releases in a release group, return the 'best' one."""
-    _rate_limit()
-    result = musicbrainzngs.browse_releases(
-        release_group=rg_mbid,
-        includes=[],
-        limit=100,
-    )
-    releases = result.get("release-list", [])
+    result = _mb_get_listing(f"rg-{rg_mbid}", "release",
+                             **{"release-group": rg_mbid, "inc": "media",
+                                "limit": 100})
+    releases = result.get("releases", [])
     if not releases:
         return None
     # Prefer the one with the most media (likely the most complete)
-    return max(releases, key=lambda r: int(r.get("medium-count", 1)))
+    return max(releases, key=lambda r: len(r.get("media") or ()) or 1)
+
+
+def _fetch_release_group(rg_mbid, skip=frozenset()):
+    """Worker: fetch the best release of a release group with its tracks.
+
+    Returns (release_mbid, release), or None if the group has no releases
+    or its best release is in *skip* (already in the DB).
+    """
+    best_rel = _get_releases_for_release_group(rg_mbid)
+    if not best_rel or best_rel["id"] in skip:
+        return None
+    return best_rel["id"], _get_release_details(best_rel["id"])
+
+
+def _scrape_release_groups(conn, rg_mbids, coverage, verbose=True, skip=frozenset(),
+                           resolve_song=None):
+    """Fetch release groups on a thread pool and insert them in order.
+
+    Threads only talk to MusicBrainz (paced together by _LIMITER), so the
+    next request is already waiting on the rate limit while this thread
+    does the DB work for the previous one.  All writes stay on the
+    calling thread.  At most MUSICBRAINZ_FETCH_WORKERS * 2 groups are in
+    flight, and if an insert fails (or on Ctrl-C) the queued fetches are
+    cancelled rather than run.  Releases whose MBID is in *skip* are not
+    fetched.
+    resolve_song: shared make_song_resolver() memo (see _insert_release).
+
+    Returns (releases_added, tracks_added).
+    """
+    if resolve_song is None:
+        resolve_song = make_song_resolver(conn)
+    releases_added = 0
+    tracks_added = 0
+    it = iter(rg_mbids)
+    with ThreadPoolExecutor(max_workers=MUSICBRAINZ_FETCH_WORKERS) as pool:
+        window = deque(
+            (rg_mbid, pool.submit(_fetch_release_group, rg_mbid, skip))
+            for rg_mbid in itertools.islice(it, MUSICBRAINZ_FETCH_WORKERS * 2)
+        )
+        try:
+            while window:
+                rg_mbid, future = window.popleft()
+                nxt = next(it, None)
+                if nxt is not None:
+                    window.append((nxt, pool.submit(_fetch_release_group, nxt, skip)))
+                try:
+                    fetched = future.result()
+                except requests.RequestException as e:
+                    if verbose:
+                        print(f"    Error fetching release group {rg_mbid}: {e}")
+                    continue
+                if fetched is None:
+                    continue
+                release_mbid, release = fetched
+                r, t = _insert_release(conn, release_mbid, release, coverage,
+                                       verbose, resolve_song)
+                releases_added += r
+                tracks_added += t
+        except BaseException:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+    conn.commit()  # one transaction per series
+    invalidate_db_songs_cache()
+    return releases_added, tracks_added
 
 
 # ── Main scraping logic ──────────────────────────────────────────────
 
-def scrape_series(conn, series_name, series_mbid, coverage, verbose=True):
+def scrape_series(conn, series_name, series_mbid, coverage, verbose=True,
+                  skip=frozenset(), resolve_song=None):
     """Scrape all releases in a MusicBrainz series.
 
+    skip: release MBIDs already in the DB; their details are not fetched.
+    resolve_song: shared make_song_resolver() memo for the whole scrape.
+
     Returns (releases_added, tracks_added).
     """
     if verbose:
         print(f"  Fetching {series_name} series from MusicBrainz...")
 
-    releases_added = 0
-    tracks_added = 0
-
     # Get release groups linked to this series
-    _rate_limit()
-    result = musicbrainzngs.get_series_by_id(
-        series_mbid, includes=["release-group-rels"]
-    )
-    rels = result.get("series", {}).get("release_group-relation-list", [])
+    result = _mb_get_listing(f"series-{series_mbid}", f"series/{series_mbid}",
+                             inc="release-group-rels")
+    rels = [rel for rel in result.get("relations", [])
+            if rel.get("target-type") == "release_group"]
 
     if not rels:
         if verbose:
             print(f"    No release groups found in series {series_name}")
-        return releases_added, tracks_added
-
-    for rel in rels:
-        rg = rel.get("release-group", {})
-        rg_id = rg.get("id")
-        if not rg_id:
-            continue
-        best_rel = _get_releases_for_release_group(rg_id)
-        if not best_rel:
-            continue
-        r, t = _process_release(conn, best_rel["id"], coverage, verbose)
-        releases_added += r
-        tracks_added += t
+        return 0, 0
 
-    return releases_added, tracks_added
+    rg_ids = [rel["release_group"]["id"] for rel in rels
+              if rel.get("release_group", {}).get("id")]
+    return _scrape_release_groups(conn, rg_ids, coverage, verbose, skip, resolve_song)
 
 
-def _process_release(conn, release_mbid, coverage, verbose=True):
-    """Process a single MusicBrainz release, creating per-date release records.
+def _insert_release(conn, release_mbid, release, coverage, verbose=True,
+                    resolve_song=None):
+    """Insert a fetched release, creating per-date release records.
 
     For multi-concert box sets, creates one release per concert date.
+    resolve_song: raw title → song_id; pass one make_song_resolver() per
+    run so titles repeated across releases are normalized once.
+    Does not commit; callers commit once per batch of releases.
     Returns (releases_added, tracks_added).
     """
-    try:
-        release = _get_release_details(release_mbid)
-    except musicbrainzngs.WebServiceError as e:
-        if verbose:
-            print(f"    Error fetching release {release_mbid}: {e}")
-        return 0, 0
-
+    if resolve_song is None:
+        resolve_song = make_song_resolver(conn)
     title = release.get("title", "")
-    media_list = release.get("medium-list", [])
+    media_list = release.get("media", [])
 
     if not media_list:
         return 0, 0
 
     # Group media (discs) by concert date
     # Each disc may have a title with an embedded date
-    date_groups = {}  # date_str → [(medium, tracks)]
+    date_groups = defaultdict(list)  # date_str → [(medium, tracks)]
 
     for medium in media_list:
-        medium_title = medium.get("title", "")
-        disc_date = parse_date_from_title(medium_title)
+        medium_title = medium.get("title")
+        disc_date = parse_date_from_title(medium_title) if medium_title else None
 
         # Only use dates parsed from disc titles — never fall back to the
         # release-level date, which is the *publication* date (e.g. 1996 for
@@ -182,11 +274,9 @@ def _process_release(conn, release_mbid, coverage, verbose=True):
         if disc_date is None:
             continue
 
-        track_list = medium.get("track-list", [])
+        track_list = medium.get("tracks", [])
         if track_list:
-            date_groups.setdefault(disc_date, []).append(
-                (medium, track_list)
-            )
+            date_groups[disc_date].append((medium, track_list))
 
     releases_added = 0
     tracks_added = 0
@@ -194,11 +284,7 @@ def _process_release(conn, release_mbid, coverage, verbose=True):
     for concert_date, media_tracks in date_groups.items():
         source_id = f"mb:{release_mbid}:{concert_date}"
 
-        # Skip if already exists
-        if db.release_exists(conn, source_id):
-            continue
-
-        release_id = db.insert_release(
+        release_id = db.insert_release_if_new(
             conn,
             source_type="musicbrainz",
             source_id=source_id,
@@ -209,40 +295,34 @@ def _process_release(conn, release_mbid, coverage, verbose=True):
             quality_rank=500,
             source_url=f"https://musicbrainz.org/release/{release_mbid}",
         )
+        if release_id is None:  # already scraped
+            continue
         releases_added += 1
 
         # Insert tracks from all media for this date
         global_track_num = 0
+        rows = []
         for medium, track_list in media_tracks:
             disc_num = int(medium.get("position", 1))
             for track in track_list:
                 global_track_num += 1
-                recording = track.get("recording", {})
+                recording = track.get("recording") or {}
                 track_title = recording.get("title", track.get("title", ""))
                 length_ms = track.get("length") or recording.get("length")
 
                 duration_secs = None
                 if length_ms:
-                    duration_secs = int(length_ms) / 1000.0
-
-                # Normalize the song title
-                song_id, _, _ = normalize_song(conn, track_title)
-
-                db.insert_track(
-                    conn,
-                    release_id=release_id,
-                    title_raw=track_title,
-                    disc_number=disc_num,
-                    track_number=global_track_num,
-                    song_id=song_id,
-                    duration_seconds=duration_secs,
-                )
-                tracks_added += 1
+                    duration_secs = length_ms / 1000.0
+
+                rows.append((release_id, resolve_song(track_title), track_title,
+                             disc_num, global_track_num, None, duration_secs,
+                             None, 0))
+        db.insert_tracks_many(conn, rows)
+        tracks_added += len(rows)
 
         if verbose:
             print(f"    {title} [{concert_date}]: {tracks_added} tracks")
 
-    conn.commit()
     return releases_added, tracks_added
 
 
@@ -253,19 +333,24 @@ def scrape_all(conn, full=False, verbose=True):
     """
     total_releases = 0
     total_tracks = 0
+    # Releases already inserted cost only their release-group browse
+    skip = frozenset() if full else frozenset(db.musicbrainz_release_mbids(conn))
+    resolve_song = make_song_resolver(conn)
 
     for series_name, series_mbid in MUSICBRAINZ_SERIES_IDS.items():
         coverage = MUSICBRAINZ_SERIES_COVERAGE.get(series_name, "unknown")
-        r, t = scrape_series(conn, series_name, series_mbid, coverage, verbose)
+        r, t = scrape_series(conn, series_name, series_mbid, coverage, verbose, skip,
+                             resolve_song)
         total_releases += r
         total_tracks += t
 
-    # Standalone box sets not in any series
+    # Standalone box sets not in any series, grouped by coverage tier
+    by_coverage = {}
     for rg_mbid, coverage in MUSICBRAINZ_STANDALONE_RELEASES.items():
-        best_rel = _get_releases_for_release_group(rg_mbid)
-        if not best_rel:
-            continue
-        r, t = _process_release(conn, best_rel["id"], coverage, verbose)
+        by_coverage.setdefault(coverage, []).append(rg_mbid)
+    for coverage, rg_mbids in by_coverage.items():
+        r, t = _scrape_release_groups(conn, rg_mbids, coverage, verbose, skip,
+                                      resolve_song)
         total_releases += r
         total_tracks += t
 
@@ -6,13 +6,23 @@ Cleaning pipeline:
 3. Classify non-songs (tuning, crowd, banter, etc.) → NULL
 4. Look up in alias table (DB) → exact match
 5. Look up in static CANONICAL_SONGS dictionary → exact match
-6. Fuzzy match via difflib against canonical names
+6. Fuzzy match (difflib ratio; rapidfuzz prefilter) against canonical names
 7. Fuzzy match against established DB songs (>=50 tracks)
 8. Create new song entry if no match found
 """
 
 import re
-import difflib
+import functools
+
+try:
+    from rapidfuzz import fuzz as _rf_fuzz, process as _rf_process
+except ImportError:
+    _rf_process = None
+
+try:
+    from cdifflib import CSequenceMatcher as _SequenceMatcher
+except ImportError:
+    from difflib import SequenceMatcher as _SequenceMatcher
 
 from gdtimings.config import FUZZY_AUTO_THRESHOLD, FUZZY_FLAG_THRESHOLD
 from gdtimings import db
@@ -294,6 +304,7 @@ for canonical, aliases in CANONICAL_SONGS.items():
 
 # All canonical names for fuzzy matching
 _CANONICAL_NAMES = list(CANONICAL_SONGS.keys())
+_CANONICAL_NAMES_LOWER = tuple(n.lower() for n in _CANONICAL_NAMES)
 
 # ── Non-song words ────────────────────────────────────────────────────
 # After cleaning, titles matching these are classified as non-songs (song_id=NULL).
@@ -321,6 +332,18 @@ _NON_SONG_WORDS = frozenset({
 })
 
 
+# Keywords that mark a non-song when they end a longer title, preceded by
+# a space or slash.  str.endswith() takes the whole tuple in one call.
+_TRAILING_NON_SONG = ("tuning", "crowd", "banter", "stage talk",
+                      "dead air", "noodling", "soundcheck",
+                      "introduction", "introductions", "applause",
+                      "crowd noise", "warmup", "warm-up")
+_TRAILING_NON_SONG_SUFFIXES = tuple(sep + kw for kw in _TRAILING_NON_SONG
+                                    for sep in (" ", "/"))
+
+_RE_NON_SONG_SPLIT = re.compile(r'\s*/\s*|\s*&\s*|\s+and\s+|\s*\+\s*|\s+-\s+')
+
+
 def _is_non_song(title):
     """Check whether a cleaned title is a non-song (tuning, crowd, etc.).
 
@@ -338,20 +361,26 @@ def _is_non_song(title):
     if lower in _NON_SONG_WORDS:
         return True
     # Compound: split on /, &, " and ", " + ", "-" (when surrounded by spaces)
-    parts = re.split(r'\s*/\s*|\s*&\s*|\s+and\s+|\s*\+\s*|\s+-\s+', lower)
+    parts = _RE_NON_SONG_SPLIT.split(lower)
     parts = [p.strip() for p in parts if p.strip()]
     if len(parts) > 1 and all(p in _NON_SONG_WORDS for p in parts):
         return True
     # Ends with a non-song keyword: "Polka Tuning", "Beer Barrel Polka tuning",
     # "Bill Graham intro", "Bobby Banter"
-    _TRAILING_NON_SONG = {"tuning", "crowd", "banter", "stage talk",
-                           "dead air", "noodling", "soundcheck",
-                           "introduction", "introductions", "applause",
-                           "crowd noise", "warmup", "warm-up"}
-    for keyword in _TRAILING_NON_SONG:
-        if lower.endswith(" " + keyword) or lower.endswith("/" + keyword):
-            return True
-    return False
+    return lower.endswith(_TRAILING_NON_SONG_SUFFIXES)
+
+
+_RE_BRACKETED_LABEL = re.compile(r'^\[.*\]$')
+_RE_SURROUNDING_DASHES = re.compile(r'^[-–—]+\s*|\s*[-–—]+$')
+_RE_PARENTHESIZED = re.compile(r'^\(([^)]+)\)$')
+_RE_REEL_MARKER = re.compile(r'^//\s*')
+_RE_ENCORE_E_PREFIX = re.compile(r'^[\s*]*[Ee]:\s*')
+_RE_ENCORE_PREFIX = re.compile(r'^[Ee]ncore:\s*')
+_RE_TIMESTAMP_PREFIX = re.compile(r'^\d{1,3}(?::\d{2})*(?:\.\d+)?\s*[]\|]\s*')
+_RE_TIMESTAMP_SPACED = re.compile(r'^\d{1,3}:\d{2}\s+\]\s*')
+_RE_DISC_DASH = re.compile(r'^Disc\d+-', re.IGNORECASE)
+_RE_T_TRACK = re.compile(r'^t\d+\.\s*', re.IGNORECASE)
+_RE_LEADING_NOTE_MARKS = re.compile(r'^[\s(e)]*[*/]+\s*')
 
 
 def _strip_metadata(s):
@@ -363,50 +392,63 @@ def _strip_metadata(s):
     s = s.rstrip('\\')
 
     # Remove bracketed metadata labels like [crowd], [tuning], [signals]
-    s = re.sub(r'^\[.*\]$', '', s).strip()
+    s = _RE_BRACKETED_LABEL.sub('', s).strip()
     # Strip surrounding dashes/hyphens: "- encore break -", "--dead air--"
-    s = re.sub(r'^[-–—]+\s*', '', s)
-    s = re.sub(r'\s*[-–—]+$', '', s)
+    s = _RE_SURROUNDING_DASHES.sub('', s)
 
     # Strip surrounding parens from non-song-like entries: "(Tuning)", "(fade in)"
-    s = re.sub(r'^\(([^)]+)\)$', r'\1', s)
+    s = _RE_PARENTHESIZED.sub(r'\1', s)
 
     # ── Leading reel markers "//" ──
     # "//St. Stephen", "// Gimme Some Lovin'"
-    s = re.sub(r'^//\s*', '', s)
+    s = _RE_REEL_MARKER.sub('', s)
 
     # ── Encore prefix "e:" or "Encore:" ──
     # "e: Keep Your Day Job", "Encore: U.S. Blues", "** E: U. S. Blues"
-    s = re.sub(r'^[\s*]*[Ee]:\s*', '', s)
-    s = re.sub(r'^[Ee]ncore:\s*', '', s)
+    s = _RE_ENCORE_E_PREFIX.sub('', s)
+    s = _RE_ENCORE_PREFIX.sub('', s)
 
     # ── Timestamp prefix "##:##]" or "##:##.##|" ──
     # "00:11] tuning/dead air", "01:16] crowd and tuning", "1:03] crowd"
     # "10:16.41| Wharf Rat", "1:13.70| Tuning"
-    s = re.sub(r'^\d{1,3}(?::\d{2})*(?:\.\d+)?\s*[]\|]\s*', '', s)
+    s = _RE_TIMESTAMP_PREFIX.sub('', s)
     # "12:54 ] Drums" — with space before bracket
-    s = re.sub(r'^\d{1,3}:\d{2}\s+\]\s*', '', s)
+    s = _RE_TIMESTAMP_SPACED.sub('', s)
 
     # ── Disc###-Song format ──
     # "Disc103-CC Rider", "Disc301-Iko Iko"
-    s = re.sub(r'^Disc\d+-', '', s, flags=re.IGNORECASE)
+    s = _RE_DISC_DASH.sub('', s)
 
     # ── t01.Song format ──
     # "t01.Set Up", "t03.CC Rider"
-    s = re.sub(r'^t\d+\.\s*', '', s, flags=re.IGNORECASE)
+    s = _RE_T_TRACK.sub('', s)
 
     # ── Leading asterisks and slashes (recording notes) ──
     # "*Desolation Row", "/Saint Stephen*", "(e) Gloria*"
-    s = re.sub(r'^[\s(e)]*[*/]+\s*', '', s)
+    s = _RE_LEADING_NOTE_MARKS.sub('', s)
 
     return s
 
 
+_RE_LEADING_TRACK_NUM = re.compile(r"^\d+\s*[\.\)]\s*")
+_RE_GD_IDENTIFIER_ONLY = re.compile(r'^gd[\s\-]?\d{2,4}[\-.\s]\S*$', re.IGNORECASE)
+_RE_GD_COMPACT_DATE_TRACK = re.compile(r'^gd\d{8}\.\d+\.', re.IGNORECASE)
+_RE_GD_DATE_TRACK_DOT = re.compile(r'^gd\d{4}-\d{2}-\d{2}\s+\d+\.\s*', re.IGNORECASE)
+_RE_GD_SHORT_DATE_TRACK = re.compile(r'^gd\d{2}-\d{2}-\d{2}\s+\d+\s+', re.IGNORECASE)
+_RE_GD_NUMBERED_DUMP = re.compile(r'^gd\s+\d+\s+\d{1,2}-\d{1,2}-\d{2,4}\b.*$', re.IGNORECASE)
+_RE_GD_SET_TRACK = re.compile(r'^gd\d{2,4}-?\d{2}-?\d{2}\s*(?:[ds]\d+\s*)?t\d+\s*[-–—.]?\s*', re.IGNORECASE)
+_RE_GD_DATE = re.compile(r'^gd\d{2,4}-?\d{2}-?\d{2}\s+(?![ds]\d)', re.IGNORECASE)
+_RE_DISC_TRACK = re.compile(r'^d\d+t\d+\s*[-–—.]\s*', re.IGNORECASE)
+_RE_DISC_COMMA_TRACK = re.compile(r'^(?:gd[\s\-]?)?Disc\d+\s*,\s*Track\d+\s*', re.IGNORECASE)
+_RE_DISC_SPELLED = re.compile(r'^Disc\s+\w+\s*,\s*track\s+\w+\s*:\s*', re.IGNORECASE)
+_RE_DOT_RUNS = re.compile(r'\.\.+')
+
+
 def _strip_identifiers(s):
     """Remove disc/track identifiers (Disc###-Song, t01.Song, gd-date
     patterns, d1t01, bare D1T12, date-disc-track, etc.)."""
     # Remove leading track numbers like "1.", "01.", "1)", "12 ."
-    s = re.sub(r"^\d+\s*[\.\)]\s*", "", s)
+    s = _RE_LEADING_TRACK_NUM.sub("", s)
     # Strip archive.org-style prefixes:
     #   "d1t01 - Title", "d2t05. Title" (disc/track notation)
     #   "gd77-05-08d1t01 - Title" (identifier prefix)
@@ -417,71 +459,101 @@ def _strip_identifiers(s):
     # Aggressive stripping: entire identifier as title (no song name)
     # "GD 1987-03-22.GEMS.d01t01", "GD-Disc02,Track11", "GD1989-07-17trk02"
     # Full identifier as entire title (no song follows): drop
-    s = re.sub(r'^gd[\s\-]?\d{2,4}[\-.\s]\S*$', '', s, flags=re.IGNORECASE).strip()
+    s = _RE_GD_IDENTIFIER_ONLY.sub('', s).strip()
     # "gd19790902.18.stella blue" — compact date.track.song
-    s = re.sub(r'^gd\d{8}\.\d+\.', '', s, flags=re.IGNORECASE)
+    s = _RE_GD_COMPACT_DATE_TRACK.sub('', s)
     # "GD1995-03-19 05. Don't Ease" — full date with track number
-    s = re.sub(r'^gd\d{4}-\d{2}-\d{2}\s+\d+\.\s*', '', s, flags=re.IGNORECASE)
+    s = _RE_GD_DATE_TRACK_DOT.sub('', s)
     # "gd94-03-21 12 Liberty" — 2-digit year date with track number
-    s = re.sub(r'^gd\d{2}-\d{2}-\d{2}\s+\d+\s+', '', s, flags=re.IGNORECASE)
+    s = _RE_GD_SHORT_DATE_TRACK.sub('', s)
     # "GD 01 6-18-83 ..." or "GD 02 6-18-83 ..." (numbered file dumps)
-    s = re.sub(r'^gd\s+\d+\s+\d{1,2}-\d{1,2}-\d{2,4}\b.*$', '', s, flags=re.IGNORECASE).strip()
-    s = re.sub(r'^gd\d{2,4}-?\d{2}-?\d{2}\s*(?:[ds]\d+\s*)?t\d+\s*[-–—.]?\s*',
-               '', s, flags=re.IGNORECASE)
+    s = _RE_GD_NUMBERED_DUMP.sub('', s).strip()
+    s = _RE_GD_SET_TRACK.sub('', s)
     # "gd88-06-25 Sugaree" — date followed directly by song (no track number)
     # Must come AFTER the more specific set/track patterns above
-    s = re.sub(r'^gd\d{2,4}-?\d{2}-?\d{2}\s+(?![ds]\d)', '', s, flags=re.IGNORECASE)
-    s = re.sub(r'^d\d+t\d+\s*[-–—.]\s*', '', s, flags=re.IGNORECASE)
+    s = _RE_GD_DATE.sub('', s)
+    s = _RE_DISC_TRACK.sub('', s)
     # "Disc01,Track01 Title" or "Disc02,Track03 Title" (comma-separated)
     # Also "GD-Disc02,Track11" (with GD prefix)
-    s = re.sub(r'^(?:gd[\s\-]?)?Disc\d+\s*,\s*Track\d+\s*', '', s, flags=re.IGNORECASE)
+    s = _RE_DISC_COMMA_TRACK.sub('', s)
     # Spelled-out disc/track: 'Disc five, track seven: "Jam into Days Between'
-    s = re.sub(r'^Disc\s+\w+\s*,\s*track\s+\w+\s*:\s*', '', s, flags=re.IGNORECASE)
+    s = _RE_DISC_SPELLED.sub('', s)
     # Clean tape-flip dotted names: "Dru..ms" → "Drums", "S..pace" → "Space"
-    s = re.sub(r'\.\.+', '', s)
+    s = _RE_DOT_RUNS.sub('', s)
 
     return s
 
 
+_RE_DISC_DASH_TRACK = re.compile(r'^\d+-\d+\s+')
+_RE_UNDERSCORE_TRACK = re.compile(r'^\d+_')
+_RE_BARE_TRACK_NUM = re.compile(r'^\d{1,3}\s+(?=[A-Za-z(])')
+_RE_DASHED_TRACK_NUM = re.compile(r'^\d+\s+[-–—]\s+')
+
+
 def _strip_track_numbers(s):
     """Remove leading track numbers in various formats."""
     # ── Disc-dash-track: "2-01 Tuning" ──
-    s = re.sub(r'^\d+-\d+\s+', '', s)
+    s = _RE_DISC_DASH_TRACK.sub('', s)
     # ── Underscore separator: "02_Mississippi Half-Step" ──
-    s = re.sub(r'^\d+_', '', s)
+    s = _RE_UNDERSCORE_TRACK.sub('', s)
 
     # ── Bare track number "NN Song" or "NNN Song" ──
     # "01 Hell In A Bucket", "14 Drumz", "100 tuning", "900 crowd"
     # Must come after disc/track prefix stripping. Only match when
     # the rest starts with a letter (avoid stripping "29 Rainy Day Women #12...")
-    s = re.sub(r'^\d{1,3}\s+(?=[A-Za-z(])', '', s)
+    s = _RE_BARE_TRACK_NUM.sub('', s)
 
     # "01 - Title" or "02 – Title" (number + spaced dash, distinct from "01." above)
-    s = re.sub(r'^\d+\s+[-–—]\s+', '', s)
+    s = _RE_DASHED_TRACK_NUM.sub('', s)
 
     return s
 
 
+_QUOTE_TABLE = str.maketrans({"\u2018": "'", "\u2019": "'",
+                              "\u201c": '"', "\u201d": '"'})
+_RE_FOOTNOTE = re.compile(r'\s*\[[a-z0-9]+\]\s*$')
+_RE_TRAILING_SYMBOLS = re.compile(r'\s*[->=→]*\s*[*#~+]+\s*$')
+_RE_E_PREFIX = re.compile(r'^\(e\)\s*')
+
+
 def _normalize_text(s):
     """Normalize fancy quotes to straight, strip footnote markers and
     trailing symbols."""
-    # Normalize quotes: convert all fancy quotes to straight
-    s = s.replace("\u2018", "'").replace("\u2019", "'")
-    s = s.replace("\u201c", '"').replace("\u201d", '"')
+    # Normalize quotes: convert all fancy quotes to straight.  Most titles
+    # are plain ASCII and have none, so skip the passes for those.
+    if not s.isascii():
+        s = s.translate(_QUOTE_TABLE)
     # Remove trailing footnote markers like [a], [b], [1]
-    s = re.sub(r'\s*\[[a-z0-9]+\]\s*$', '', s)
+    s = _RE_FOOTNOTE.sub('', s)
 
     # ── Trailing symbols: asterisks, #, ~, + ──
     # "Wang Dang Doodle *", "encore break~~", "All Along The Watchtower ->*"
     # Strip trailing *, #, ~, + and combinations (but preserve song-internal ones
     # like "Slipknot!" or "Rainy Day Women #12 And #35")
-    s = re.sub(r'\s*[->=→]*\s*[*#~+]+\s*$', '', s)
+    s = _RE_TRAILING_SYMBOLS.sub('', s)
     # Also handle leading (e) prefix: "(e) Gloria*" → "Gloria"
-    s = re.sub(r'^\(e\)\s*', '', s)
+    s = _RE_E_PREFIX.sub('', s)
 
     return s
 
 
+_RE_RECORDING_NOTE = re.compile(r'\s*\((?:\d+\s+)?(?:AUD|SBD|aud|sbd|audience|Aud)[^)]*\)\s*', re.IGNORECASE)
+_RE_X_PREFIX = re.compile(r'^\(X\)\s*', re.IGNORECASE)
+_RE_TAPE_FLIP = re.compile(r'\s*\((?:[Tt]ape\s+[Ff]lip[^)]*)\)')
+_RE_BRACKETED_DURATION = re.compile(r'\s*\[\d+:\d{2}\]\s*;?\s*')
+_RE_SET_BREAK_SUFFIX = re.compile(r',\s*[Ss]et\s+[Bb]reak\s*$')
+_RE_TRAILING_SEGUE = re.compile(r'\s*-?[>→]+\s*$')
+_RE_TRAILING_DURATION = re.compile(r'\s*[–\-—]\s*\d+:\d{2}(?::\d{2})?\s*$')
+_RE_WRITER_CREDITS = re.compile(r'"\s*-?[>→]?\s*\([^)]+\)\s*$')
+_RE_QUOTE_DASH = re.compile(r'"\s*[–\-—]\s*$')
+_RE_QUOTE_METADATA = re.compile(r'"\s*-?[>→(–\-—].*$')
+_RE_PART_SUFFIX = re.compile(r'",?\s*part\s+\d+\s*$', re.IGNORECASE)
+_RE_SET_ANNOTATION = re.compile(r"\s*[\[\(](?:Set|Disc|Encore)\s*\d*[\]\)]", re.IGNORECASE)
+_RE_REEL_NOTE = re.compile(r'\s*\(reel\s+[^)]+\)', re.IGNORECASE)
+_RE_SEGMENT_LABEL = re.compile(r'\s*\(?(V\d+|verse\s+\d+|part\s+\d+|continued)\)?\s*$', re.IGNORECASE)
+_RE_TRAILING_MARKS = re.compile(r'[*#~]+\s*$')
+
+
 def _strip_annotations(s):
     """Remove recording metadata (AUD/SBD), tape flip annotations,
     duration brackets, set annotations, segue markers, writer credits,
@@ -489,40 +561,39 @@ def _strip_annotations(s):
     # ── Recording metadata annotations ──
     # "(2 AUD Matrix)", "(audience recording)", "(Aud patch)",
     # "(some music lost in the flip-spliced) (audience section edited)"
-    s = re.sub(r'\s*\((?:\d+\s+)?(?:AUD|SBD|aud|sbd|audience|Aud)[^)]*\)\s*', '', s,
-               flags=re.IGNORECASE)
+    s = _RE_RECORDING_NOTE.sub('', s)
     # "(X)Casey Jones(audience recording)" — leading (X) marker
-    s = re.sub(r'^\(X\)\s*', '', s, flags=re.IGNORECASE)
+    s = _RE_X_PREFIX.sub('', s)
 
     # ── Tape flip annotations ──
     # "(Tape Flip After Song)", "(Tape Flip)", "(tape flip)"
-    s = re.sub(r'\s*\((?:[Tt]ape\s+[Ff]lip[^)]*)\)', '', s)
+    s = _RE_TAPE_FLIP.sub('', s)
 
     # ── Duration in brackets "[6:05]" ──
     # "Saint Stephen [6:05]", "Bertha [4:52] ;"
-    s = re.sub(r'\s*\[\d+:\d{2}\]\s*;?\s*', '', s)
+    s = _RE_BRACKETED_DURATION.sub('', s)
 
     # ── Trailing ", Set Break" / "Announcements, Set Break" ──
-    s = re.sub(r',\s*[Ss]et\s+[Bb]reak\s*$', '', s)
+    s = _RE_SET_BREAK_SUFFIX.sub('', s)
 
     # Remove segue markers FIRST (before duration, since → may follow duration)
     # Handle both > and -> variants
-    s = re.sub(r'\s*-?[>→]+\s*$', '', s)
+    s = _RE_TRAILING_SEGUE.sub('', s)
     # Remove trailing duration like – 14:35 or - 5:32
-    s = re.sub(r'\s*[–\-—]\s*\d+:\d{2}(?::\d{2})?\s*$', '', s)
+    s = _RE_TRAILING_DURATION.sub('', s)
     # Remove trailing writer credits: " (writers) with optional segue marker between
-    s = re.sub(r'"\s*-?[>→]?\s*\([^)]+\)\s*$', '', s)
+    s = _RE_WRITER_CREDITS.sub('', s)
     # Remove trailing " - or " – (e.g. 'St. Stephen" -')
-    s = re.sub(r'"\s*[–\-—]\s*$', '', s)
+    s = _RE_QUOTE_DASH.sub('', s)
     # Catch-all: if a bare " remains followed by metadata (writers, duration, etc.)
     # truncate at the " — the title is everything before it
-    s = re.sub(r'"\s*-?[>→(–\-—].*$', '', s)
+    s = _RE_QUOTE_METADATA.sub('', s)
     # Remove trailing ", part N" (e.g. 'Space", part 1')
-    s = re.sub(r'",?\s*part\s+\d+\s*$', '', s, flags=re.IGNORECASE)
+    s = _RE_PART_SUFFIX.sub('', s)
     # Remove set annotations like "[Set 1]" or "(Set 2)"
-    s = re.sub(r"\s*[\[\(](?:Set|Disc|Encore)\s*\d*[\]\)]", "", s, flags=re.IGNORECASE)
+    s = _RE_SET_ANNOTATION.sub("", s)
     # Remove parenthetical reel/track metadata like "(reel #2 side B; 8-track 15 ips)"
-    s = re.sub(r'\s*\(reel\s+[^)]+\)', '', s, flags=re.IGNORECASE)
+    s = _RE_REEL_NOTE.sub('', s)
     # Strip surrounding matched quote pairs (but not lone apostrophes like Truckin')
     if (s.startswith('"') and s.endswith('"')) or \
        (s.startswith("'") and s.endswith("'") and len(s) > 2):
@@ -534,23 +605,25 @@ def _strip_annotations(s):
     # These are labeled parts of ONE performance (e.g. Dark Star V1/V2) and
     # must resolve to the same canonical song. Do NOT strip "Reprise" — that
     # indicates a musically distinct song (Category A, see CONCEPTS.md).
-    s = re.sub(r'\s*\(?(V\d+|verse\s+\d+|part\s+\d+|continued)\)?\s*$', '', s,
-               flags=re.IGNORECASE)
+    s = _RE_SEGMENT_LABEL.sub('', s)
     # Final cleanup: segue markers that may remain after other stripping
-    s = re.sub(r'\s*-?[>→]+\s*$', '', s)
+    s = _RE_TRAILING_SEGUE.sub('', s)
     # Strip any remaining trailing asterisks/symbols after all other cleanup
-    s = re.sub(r'[*#~]+\s*$', '', s)
+    s = _RE_TRAILING_MARKS.sub('', s)
 
     return s
 
 
+_RE_WHITESPACE = re.compile(r"\s+")
+
+
 def _validate_result(s):
     """Non-song classification, length check, letter count.
 
     Returns the cleaned string, or empty string if invalid.
     """
     # Collapse whitespace
-    s = re.sub(r"\s+", " ", s).strip()
+    s = _RE_WHITESPACE.sub(" ", s).strip()
 
     # ── Non-song classification ──
     # After all cleaning, check if the result is a non-song and return ""
@@ -572,23 +645,31 @@ def _validate_result(s):
     return s
 
 
+_RE_DATE_PREFIX = re.compile(r'^(?:\d{1,2}[-/]\d{2,4}|\d{2}-\d{2}-\d{2})\s')
+_RE_COMBO_SEGUE = re.compile(r'[A-Za-z\'\"]\s*(?:->|→|>)\s*[A-Za-z(]')
+_RE_BARE_IDENTIFIER = re.compile(
+    r'^(?:D\d+T?\d*$|disc\d+$|\d{1,2}-\d{1,2}-\d{2,4}d\d+t\d+)', re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=16384)
 def clean_title(raw):
     """Strip track numbers, segue markers, set annotations, normalize quotes.
 
     Returns empty string for:
     - Multi-song combo tracks (e.g. "Help > Slip > Franklin's")
     - Non-song tracks (tuning, crowd, banter, etc.)
+
+    Pure, and the same raw titles ("Drums", "Tuning") recur across
+    thousands of recordings, so results are memoized.
     """
     s = raw.strip()
 
     s = _strip_metadata(s)
 
     # ── Date-prefix tracks → drop ──
-    # "05/85 - Thursday", "11/84 Augusta Civic Center", "95-02-20 211 Crowd"
-    if re.match(r'^\d{1,2}[-/]\d{2,4}\s', s):
-        return ""
-    # "95-02-20 211 Crowd" — YYMMDD prefix
-    if re.match(r'^\d{2}-\d{2}-\d{2}\s', s):
+    # "05/85 - Thursday", "11/84 Augusta Civic Center",
+    # "95-02-20 211 Crowd" (YYMMDD prefix)
+    if _RE_DATE_PREFIX.match(s):
         return ""
 
     # ── Multi-song combo tracks → drop entirely ──
@@ -599,19 +680,14 @@ def clean_title(raw):
     # (with at least one letter on each side of the arrow).
     # Exclude tape-flip annotations like "Dru..ms > (Tape Flip)"
     # and "S..pace > (Tape Flip Near Start)" — those are single songs.
-    if re.search(r'[A-Za-z\'\"]\s*(?:->|→|>)\s*[A-Za-z(]', s) \
-       and '(Tape Flip' not in s:
+    if _RE_COMBO_SEGUE.search(s) and '(Tape Flip' not in s:
         return ""
 
     s = _strip_identifiers(s)
 
-    # Bare disc/track codes with no song: "D1T12", "D2T05", "disc305"
-    if re.match(r'^D\d+T?\d*$', s, flags=re.IGNORECASE):
-        return ""
-    if re.match(r'^disc\d+$', s, flags=re.IGNORECASE):
-        return ""
-    # Date-disc-track identifiers: "4-26-69d1t03"
-    if re.match(r'^\d{1,2}-\d{1,2}-\d{2,4}[dD]\d+[tT]\d+', s):
+    # Bare disc/track codes with no song: "D1T12", "D2T05", "disc305",
+    # and date-disc-track identifiers: "4-26-69d1t03"
+    if _RE_BARE_IDENTIFIER.match(s):
         return ""
 
     s = _strip_track_numbers(s)
@@ -622,82 +698,285 @@ def clean_title(raw):
     return s
 
 
-def normalize_song(conn, raw_title):
-    """Resolve a raw track title to a (song_id, canonical_name, match_type) tuple.
+def _best_match(query, choices, cutoff):
+    """Closest of *choices* to *query*: (index, ratio), or None below cutoff.
 
-    match_type is one of: 'exact', 'alias', 'fuzzy', 'new'
+    Scores are always difflib's SequenceMatcher ratio (cdifflib's C port
+    of it when available), so FUZZY_*_THRESHOLD mean the same thing and
+    the aliases written do not depend on which optional packages are
+    installed.  rapidfuzz, when installed, only prefilters: its ratio is
+    2*LCS/total_length, and difflib's matching blocks are a common
+    subsequence, so rapidfuzz never scores a candidate below difflib and
+    dropping those under the cutoff cannot drop difflib's winner.
     """
-    cleaned = clean_title(raw_title)
-    if not cleaned:
-        return None, None, None
+    # An identical candidate always wins with 1.0; skip scoring entirely.
+    try:
+        return choices.index(query), 1.0
+    except ValueError:
+        pass
+    if _rf_process is not None:
+        # processor=None: rapidfuzz < 3.0 would otherwise lowercase and
+        # strip punctuation before scoring.  The epsilon keeps candidates
+        # that sit exactly on the cutoff despite float rounding.
+        hits = _rf_process.extract(query, choices, scorer=_rf_fuzz.ratio,
+                                   processor=None, limit=None,
+                                   score_cutoff=cutoff * 100 - 1e-6)
+        candidates = sorted((index, choice) for choice, _, index in hits)
+    else:
+        candidates = enumerate(choices)
+    # Same scan as difflib.get_close_matches(n=1): one matcher holds the
+    # query as seq2 (its index is built once), and the cheap upper bounds
+    # reject most candidates before the full ratio().  Ties go to the
+    # larger string, as in get_close_matches.
+    matcher = _SequenceMatcher()
+    matcher.set_seq2(query)
+    best = None
+    for index, choice in candidates:
+        matcher.set_seq1(choice)
+        if matcher.real_quick_ratio() < cutoff or matcher.quick_ratio() < cutoff:
+            continue
+        score = matcher.ratio()
+        if score >= cutoff and (best is None or (score, choice) > best[1:]):
+            best = (index, score, choice)
+    if best is None:
+        return None
+    index, _, matched = best
+    return index, _SequenceMatcher(None, query, matched).ratio()
 
+
+@functools.lru_cache(maxsize=8192)
+def _fuzzy_canonical(lower):
+    """Fuzzy-match a lowercased title against the static canonical names.
+
+    Returns (canonical_name, ratio) or None.  Depends only on the
+    CANONICAL_SONGS dictionary, so results are memoized.
+    """
+    match = _best_match(lower, _CANONICAL_NAMES_LOWER, FUZZY_FLAG_THRESHOLD)
+    if not match:
+        return None
+    index, ratio = match
+    return _ALIAS_MAP[_CANONICAL_NAMES_LOWER[index]], ratio
+
+
+# Step 5's established-songs list (>=50 tracks), reused across
+# normalize_song() calls instead of re-running the GROUP BY every time.
+# Tied to one connection and re-read only after invalidate_db_songs_cache(),
+# which the scrapers call at each commit, so the songs a title can match
+# depend on what has been inserted, never on elapsed time.
+_db_songs_cache = {"conn": None, "names": (), "lower": ()}
+
+
+def invalidate_db_songs_cache():
+    """Drop the cached established-songs list used by normalize_song().
+
+    Call after committing new tracks so step 5 sees songs that have
+    since reached 50 tracks.
+    """
+    _db_songs_cache.update(conn=None, names=(), lower=())
+
+
+def _established_db_songs(conn):
+    """Return (names, lowercased names) of songs with >=50 tracks."""
+    cache = _db_songs_cache
+    if cache["conn"] is not conn:
+        names = tuple(row["canonical_name"] for row in conn.execute(
+            """SELECT s.canonical_name
+               FROM songs s
+               JOIN tracks t ON t.song_id = s.id
+               GROUP BY s.id
+               HAVING COUNT(t.id) >= 50"""
+        ))
+        cache.update(conn=conn, names=names,
+                     lower=tuple(n.lower() for n in names))
+    return cache["names"], cache["lower"]
+
+
+_RE_HAS_LETTER = re.compile(r'[a-zA-Z]')
+
+
+class _DbSongStore:
+    """Song/alias lookups for normalize_song(), one query per call."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def by_alias(self, lower):
+        return db.get_song_and_name_by_alias(self.conn, lower)
+
+    def by_lower_name(self, lower):
+        row = self.conn.execute(
+            "SELECT id, canonical_name FROM songs WHERE LOWER(canonical_name) = ?", (lower,)
+        ).fetchone()
+        return (row["id"], row["canonical_name"]) if row else None
+
+    def song_id(self, canonical):
+        return db.get_or_create_song(self.conn, canonical)
+
+    def add_alias(self, lower, song_id, alias_type):
+        db.add_alias(self.conn, lower, song_id, alias_type)
+
+
+class _BatchSongStore:
+    """The same lookups as _DbSongStore, against tables preloaded once.
+
+    New songs are inserted as they are found (their ids are needed right
+    away); new aliases are buffered for one executemany in flush().
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.names = {}     # song id → canonical_name
+        self.ids = {}       # canonical_name → song id
+        self.lowered = {}   # SQLite LOWER(canonical_name) → song id (first wins)
+        for song_id, name, lowered in db.execute_tuples(
+                conn, "SELECT id, canonical_name, LOWER(canonical_name) "
+                      "FROM songs ORDER BY id"):
+            self.names[song_id] = name
+            self.ids[name] = song_id
+            self.lowered.setdefault(lowered, song_id)
+        self.aliases = dict(db.execute_tuples(
+            conn, "SELECT alias, song_id FROM song_aliases"))
+        self.pending = []
+
+    def by_alias(self, lower):
+        song_id = self.aliases.get(lower)
+        return (song_id, self.names[song_id]) if song_id else None
+
+    def by_lower_name(self, lower):
+        song_id = self.lowered.get(lower)
+        return (song_id, self.names[song_id]) if song_id else None
+
+    def song_id(self, canonical):
+        song_id = self.ids.get(canonical)
+        if song_id is None:
+            song_id = db.get_or_create_song(self.conn, canonical)
+            self.names[song_id] = canonical
+            self.ids[canonical] = song_id
+            self.lowered.setdefault(
+                self.conn.execute("SELECT LOWER(?)", (canonical,)).fetchone()[0],
+                song_id)
+        return song_id
+
+    def add_alias(self, lower, song_id, alias_type):
+        # INSERT OR IGNORE: the first alias recorded for a title wins
+        if lower not in self.aliases:
+            self.aliases[lower] = song_id
+            self.pending.append((lower, song_id, alias_type))
+
+    def flush(self):
+        db.add_aliases_many(self.conn, self.pending)
+        self.pending = []
+
+
+def _lookup_title(raw_title):
+    """clean_title(), or None if what is left cannot be a song name."""
+    cleaned = clean_title(raw_title)
     # Reject titles that are purely punctuation or too short to be a song name
-    if len(cleaned) < 2 or not re.search(r'[a-zA-Z]', cleaned):
-        return None, None, None
+    if len(cleaned) < 2 or not _RE_HAS_LETTER.search(cleaned):
+        return None
+    return cleaned
+
 
+def _resolve_song(conn, cleaned, store):
+    """Steps 1-6 of normalize_song() for a cleaned title."""
     lower = cleaned.lower()
 
     # 1. Check DB alias table first (includes manual corrections)
-    song_id = db.get_song_by_alias(conn, lower)
-    if song_id:
-        row = conn.execute("SELECT canonical_name FROM songs WHERE id = ?", (song_id,)).fetchone()
-        return song_id, row["canonical_name"], "alias"
+    hit = store.by_alias(lower)
+    if hit:
+        return hit[0], hit[1], "alias"
 
     # 2. Check static dictionary
     if lower in _ALIAS_MAP:
         canonical = _ALIAS_MAP[lower]
-        song_id = db.get_or_create_song(conn, canonical)
-        db.add_alias(conn, lower, song_id, "variant")
+        song_id = store.song_id(canonical)
+        store.add_alias(lower, song_id, "variant")
         return song_id, canonical, "exact"
 
     # 3. Check if already a canonical name in DB
-    row = conn.execute(
-        "SELECT id, canonical_name FROM songs WHERE LOWER(canonical_name) = ?", (lower,)
-    ).fetchone()
-    if row:
-        db.add_alias(conn, lower, row["id"], "variant")
-        return row["id"], row["canonical_name"], "exact"
+    hit = store.by_lower_name(lower)
+    if hit:
+        store.add_alias(lower, hit[0], "variant")
+        return hit[0], hit[1], "exact"
 
     # 4. Fuzzy match against canonical names
-    matches = difflib.get_close_matches(lower, [n.lower() for n in _CANONICAL_NAMES],
-                                         n=1, cutoff=FUZZY_FLAG_THRESHOLD)
-    if matches:
-        matched_lower = matches[0]
-        canonical = _ALIAS_MAP[matched_lower]
-        ratio = difflib.SequenceMatcher(None, lower, matched_lower).ratio()
+    match = _fuzzy_canonical(lower)
+    if match:
+        canonical, ratio = match
         alias_type = "auto_fuzzy" if ratio >= FUZZY_AUTO_THRESHOLD else "fuzzy_flagged"
-        song_id = db.get_or_create_song(conn, canonical)
-        db.add_alias(conn, lower, song_id, alias_type)
+        song_id = store.song_id(canonical)
+        store.add_alias(lower, song_id, alias_type)
         return song_id, canonical, "fuzzy"
 
     # 5. Fuzzy match against established DB songs (>=50 tracks)
-    db_songs = conn.execute(
-        """SELECT s.canonical_name
-           FROM songs s
-           JOIN tracks t ON t.song_id = s.id
-           GROUP BY s.id
-           HAVING COUNT(t.id) >= 50"""
-    ).fetchall()
-    if db_songs:
-        db_names = [row["canonical_name"] for row in db_songs]
-        db_matches = difflib.get_close_matches(
-            lower, [n.lower() for n in db_names],
-            n=1, cutoff=FUZZY_AUTO_THRESHOLD,
-        )
-        if db_matches:
-            matched_lower = db_matches[0]
-            # Find the original-cased canonical name
-            canonical = next(n for n in db_names if n.lower() == matched_lower)
-            song_id = db.get_or_create_song(conn, canonical)
-            db.add_alias(conn, lower, song_id, "auto_fuzzy_db")
+    db_names, db_lower = _established_db_songs(conn)
+    if db_names:
+        db_match = _best_match(lower, db_lower, FUZZY_AUTO_THRESHOLD)
+        if db_match:
+            canonical = db_names[db_match[0]]
+            song_id = store.song_id(canonical)
+            store.add_alias(lower, song_id, "auto_fuzzy_db")
             return song_id, canonical, "fuzzy"
 
     # 6. No match — create new song entry
-    song_id = db.get_or_create_song(conn, cleaned)
-    db.add_alias(conn, lower, song_id, "variant")
+    song_id = store.song_id(cleaned)
+    store.add_alias(lower, song_id, "variant")
     return song_id, cleaned, "new"
 
 
+def normalize_song(conn, raw_title):
+    """Resolve a raw track title to a (song_id, canonical_name, match_type) tuple.
+
+    match_type is one of: 'exact', 'alias', 'fuzzy', 'new'
+    """
+    cleaned = _lookup_title(raw_title)
+    if cleaned is None:
+        return None, None, None
+    return _resolve_song(conn, cleaned, _DbSongStore(conn))
+
+
+def normalize_songs_batch(conn, raw_titles):
+    """normalize_song() over many titles, in one transaction.
+
+    The alias and song tables are read once up front and the new aliases
+    written with one executemany, instead of several queries per title.
+    Returns a list of (song_id, canonical_name, match_type) tuples in
+    input order, the same as calling normalize_song() on each in turn.
+    """
+    results = []
+    with db.transaction(conn):
+        store = _BatchSongStore(conn)
+        for raw_title in raw_titles:
+            cleaned = _lookup_title(raw_title)
+            if cleaned is None:
+                results.append((None, None, None))
+            else:
+                results.append(_resolve_song(conn, cleaned, store))
+        store.flush()
+    return results
+
+
+def make_song_resolver(conn):
+    """Return a memoizing ``resolve(raw_title) -> song_id`` for one run.
+
+    normalize_song() records an alias for every title it resolves, so a
+    repeated title would only repeat that lookup; within a scrape the
+    answer cannot change.  Keyed on the raw title, so clean_title() is
+    skipped too.  Also starts the run with a fresh established-songs list.
+    """
+    invalidate_db_songs_cache()
+    cache = {}
+
+    def resolve(raw_title):
+        try:
+            return cache[raw_title]
+        except KeyError:
+            song_id = cache[raw_title] = normalize_song(conn, raw_title)[0]
+            return song_id
+
+    return resolve
+
+
 def prune_rare_songs(conn, min_tracks=3):
     """Null out song_id for songs with fewer than min_tracks tracks.
 
@@ -736,4 +1015,5 @@ def prune_rare_songs(conn, min_tracks=3):
         pruned += 1
 
     conn.commit()
+    invalidate_db_songs_cache()
     return pruned
@@ -18,17 +18,16 @@ import html as html_module
 from html.parser import HTMLParser
 
 from gdtimings.config import (
-    CATEGORY_COVERAGE,
-    RELEASE_COVERAGE_OVERRIDES,
     WIKIPEDIA_API,
     WIKIPEDIA_CATEGORIES,
     WIKIPEDIA_RATE_LIMIT,
     WIKIPEDIA_USER_AGENT,
+    coverage_for,
 )
 from gdtimings.http_utils import api_get_with_retry, create_session, progress_line
 from gdtimings import db
 from gdtimings.location import is_us_state, normalize_state
-from gdtimings.normalize import normalize_song
+from gdtimings.normalize import invalidate_db_songs_cache, normalize_song
 
 
 class _TagStripper(HTMLParser):
@@ -542,10 +541,7 @@ def scrape_album(conn, session, page_title, category=None, source_url=None):
     # Parse infobox
     info = parse_infobox(html_text)
     concert_date = parse_concert_date(info.get("recorded"))
-    # Per-release override takes priority, then category default
-    coverage = RELEASE_COVERAGE_OVERRIDES.get(
-        page_title, CATEGORY_COVERAGE.get(category, "unknown")
-    )
+    coverage = coverage_for(category, page_title)
 
     # Parse venue into structured fields
     venue_name, city, state = parse_venue_location(info.get("venue"))
@@ -574,21 +570,16 @@ def scrape_album(conn, session, page_title, category=None, source_url=None):
 
     # Parse and insert tracks
     tracks = parse_tracks(html_text)
+    rows = []
     for t in tracks:
         song_id, _, _ = normalize_song(conn, t["title_raw"])
-        db.insert_track(
-            conn,
-            release_id=release_id,
-            title_raw=t["title_raw"],
-            disc_number=t.get("disc", 1),
-            track_number=t["track"],
-            song_id=song_id,
-            set_name=t.get("set_name"),
-            duration_seconds=t.get("duration"),
-            writers=t.get("writers"),
-            segue=t.get("segue", 0),
-        )
+        rows.append((
+            release_id, song_id, t["title_raw"], t.get("disc", 1), t["track"],
+            t.get("set_name"), t.get("duration"), t.get("writers"), t.get("segue", 0),
+        ))
+    db.insert_tracks_many(conn, rows)
     conn.commit()
+    invalidate_db_songs_cache()
 
     return release_id, len(tracks)
 
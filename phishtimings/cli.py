@@ -1,12 +1,10 @@
 """CLI with subcommands for the Phish timings database."""
 
 import argparse
-import csv
 import os
 import sys
 
 from phishtimings import db
-from phishtimings.analyze import compute_song_stats, print_song_summary, backfill_set_names
 from phishtimings.config import PI_CACHE_DIR
 
 
@@ -42,17 +40,22 @@ def cmd_scrape(args):
         if releases == 0 and tracks == 0:
             print("  No new data (all phish.in shows already scraped).")
 
+    db.refresh_planner_stats(conn)
     conn.close()
 
 
 def cmd_analyze(args):
     """Compute song statistics, backfill set_name, and flag outliers."""
+    from phishtimings.analyze import (
+        backfill_set_names, compute_song_stats, print_song_summary,
+    )
     conn = db.get_connection()
     print("Backfilling set_name from phish.in cache...")
     backfill_set_names(conn)
     print("Computing song statistics...")
     compute_song_stats(conn)
     print_song_summary(conn)
+    db.refresh_planner_stats(conn)
     conn.close()
 
 
@@ -96,13 +99,13 @@ def _print_coverage_report(conn):
     if not os.path.isdir(PI_CACHE_DIR):
         return
 
-    # Count cached show dates (files named YYYY-MM-DD.json in subdirs)
+    # Count cached show dates (files named YYYY-MM-DD.json[.zst] in subdirs)
     import re
     date_pat = re.compile(r'^\d{4}-\d{2}-\d{2}$')
     cached_dates = set()
     for dirpath, _, filenames in os.walk(PI_CACHE_DIR):
         for fname in filenames:
-            stem = fname.rsplit('.', 1)[0] if '.' in fname else fname
+            stem = fname.split('.', 1)[0]
             if date_pat.match(stem):
                 cached_dates.add(stem)
 
@@ -125,26 +128,21 @@ def _print_coverage_report(conn):
 def cmd_export(args):
     """Export song timings to CSV."""
     conn = db.get_connection()
-    rows = db.export_tracks(conn)
-    if not rows:
+    if conn.execute("SELECT 1 FROM tracks LIMIT 1").fetchone() is None:
         print("No data to export. Run 'scrape' first.")
         conn.close()
         return
 
-    fieldnames = rows[0].keys()
+    cursor = db.export_tracks(conn)
     out = args.output
-    if out == "-":
-        writer = csv.DictWriter(sys.stdout, fieldnames=fieldnames)
-        writer.writeheader()
-        for row in rows:
-            writer.writerow(dict(row))
-    else:
-        with open(out, "w", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            for row in rows:
-                writer.writerow(dict(row))
-        print(f"Exported {len(rows)} tracks to {out}")
+    f = sys.stdout if out == "-" else open(out, "w", newline="")
+    try:
+        count = db.write_csv(cursor, f)
+    finally:
+        if f is not sys.stdout:
+            f.close()
+    if out != "-":
+        print(f"Exported {count} tracks to {out}")
     conn.close()
 
 
@@ -8,21 +8,32 @@ from gdtimings.db import (  # noqa: F401 — re-export everything
     SCHEMA,
     get_scrape_state,
     set_scrape_state,
+    transaction,
+    refresh_planner_stats,
+    execute_tuples,
     release_exists,
+    existing_source_ids,
     insert_release,
+    insert_release_if_new,
     update_release,
     get_or_create_song,
     get_song_by_alias,
+    get_song_and_name_by_alias,
     add_alias,
     insert_track,
-    get_tracks_for_song,
+    insert_tracks_many,
+    add_aliases_many,
     all_songs,
     all_releases,
     db_stats,
     unmatched_tracks,
+    unmatched_title_count,
     update_song_stats,
+    update_song_stats_many,
     mark_outlier,
+    mark_outliers,
     export_tracks,
+    write_csv,
 )
 from gdtimings.db import get_connection as _gd_get_connection
 
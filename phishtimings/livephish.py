@@ -180,7 +180,7 @@ def _process_container_from_cache(conn, cached_data, existing_dates, verbose=Tru
     )
 
     tracks = response.get("tracks", [])
-    tracks_added = 0
+    rows = []
     for track in tracks:
         raw_title = track.get("songTitle", "")
         if not raw_title:
@@ -197,19 +197,14 @@ def _process_container_from_cache(conn, cached_data, existing_dates, verbose=Tru
 
         song_id, _, _ = normalize_song(conn, raw_title)
 
-        db.insert_track(
-            conn,
-            release_id=release_id,
-            title_raw=raw_title,
-            disc_number=disc_num,
-            track_number=track_num,
-            song_id=song_id,
-            duration_seconds=duration,
-            set_name=set_name,
-        )
-        tracks_added += 1
+        rows.append((
+            release_id, song_id, raw_title, disc_num, track_num,
+            set_name, duration, None, 0,
+        ))
 
+    db.insert_tracks_many(conn, rows)
     conn.commit()
+    tracks_added = len(rows)
     existing_dates.add(concert_date)
 
     if verbose:
@@ -150,7 +150,7 @@ def _process_show_from_cache(conn, cached_data, existing_dates, verbose=True):
     )
 
     tracks = cached_data.get("tracks", [])
-    tracks_added = 0
+    rows = []
     for track in tracks:
         raw_title = track.get("title", "")
         if not raw_title:
@@ -164,19 +164,14 @@ def _process_show_from_cache(conn, cached_data, existing_dates, verbose=True):
 
         song_id, _, _ = normalize_song(conn, raw_title)
 
-        db.insert_track(
-            conn,
-            release_id=release_id,
-            title_raw=raw_title,
-            disc_number=1,
-            track_number=position,
-            song_id=song_id,
-            duration_seconds=duration_seconds,
-            set_name=set_name,
-        )
-        tracks_added += 1
+        rows.append((
+            release_id, song_id, raw_title, 1, position,
+            set_name, duration_seconds, None, 0,
+        ))
 
+    db.insert_tracks_many(conn, rows)
     conn.commit()
+    tracks_added = len(rows)
 
     if verbose:
         print(f"    {title}: {tracks_added} tracks")
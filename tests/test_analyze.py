@@ -6,11 +6,17 @@ import pytest
 
 from gdtimings import db
 from gdtimings.analyze import (
-    classify_song_types, compute_song_stats, detect_sandwiches, _per_show_durations,
+    classify_song_types, compute_song_stats, detect_sandwiches, _per_song_shows,
+    _sorted_median,
 )
 from tests.conftest import make_release, make_track
 
 
+def _durations(conn):
+    """song_id → sorted [(concert_date, duration)] from _per_song_shows()."""
+    return {song_id: date_durs for song_id, _, date_durs in _per_song_shows(conn)}
+
+
 class TestPerShowDurations:
     """Tests for the SQL-based per-show aggregation."""
 
@@ -21,7 +27,7 @@ class TestPerShowDurations:
         make_track(conn, release_id=rid, song_id=song_id, duration=1200, track_num=1)
         conn.commit()
 
-        data = _per_show_durations(conn)
+        data = _durations(conn)
         assert song_id in data
         assert len(data[song_id]) == 1
         assert data[song_id][0] == ("1977-05-08", 1200)
@@ -34,7 +40,7 @@ class TestPerShowDurations:
         make_track(conn, release_id=rid, song_id=song_id, duration=1400, track_num=5)
         conn.commit()
 
-        data = _per_show_durations(conn)
+        data = _durations(conn)
         # Should take the MAX (1400), not sum or average
         assert len(data[song_id]) == 1
         assert data[song_id][0][1] == 1400
@@ -52,7 +58,7 @@ class TestPerShowDurations:
         make_track(conn, release_id=rid2, song_id=song_id, duration=1200, track_num=1)
         conn.commit()
 
-        data = _per_show_durations(conn)
+        data = _durations(conn)
         assert len(data[song_id]) == 1
         # Should pick SBD (quality_rank=300) release's duration
         assert data[song_id][0][1] == 1200
@@ -66,7 +72,7 @@ class TestPerShowDurations:
         make_track(conn, release_id=rid2, song_id=song_id, duration=900, track_num=1)
         conn.commit()
 
-        data = _per_show_durations(conn)
+        data = _durations(conn)
         assert len(data[song_id]) == 2
 
     def test_null_song_id_excluded(self, conn):
@@ -75,9 +81,72 @@ class TestPerShowDurations:
         make_track(conn, release_id=rid, song_id=None, duration=1200, track_num=1)
         conn.commit()
 
-        data = _per_show_durations(conn)
+        data = _durations(conn)
         assert len(data) == 0
 
+    def test_sorted_by_duration(self, conn):
+        """Each song's shows come back shortest first, ready for the median."""
+        song_id = db.get_or_create_song(conn, "Dark Star")
+        for i, (date, dur) in enumerate([("1977-05-08", 1500),
+                                          ("1977-05-09", 900),
+                                          ("1977-05-10", 1200)]):
+            rid = make_release(conn, source_id=f"r{i}", concert_date=date)
+            make_track(conn, release_id=rid, song_id=song_id, duration=dur,
+                       track_num=1)
+        conn.commit()
+
+        durs = [d for _, d in _durations(conn)[song_id]]
+        assert durs == [900, 1200, 1500]
+
+
+class TestSortedMedian:
+    @pytest.mark.parametrize("durs", [[600], [600, 900], [1, 2, 3], [1, 2, 3, 10]])
+    def test_matches_statistics_median(self, durs):
+        date_durs = [(None, d) for d in durs]
+        assert _sorted_median(date_durs) == statistics.median(durs)
+
+
+class TestPerSongSummary:
+    """Tests for the per-song window aggregates over per-show durations."""
+
+    def test_matches_python_statistics(self, conn):
+        song_id = db.get_or_create_song(conn, "Dark Star")
+        for i, (date, dur) in enumerate([("1977-05-10", 1500),
+                                          ("1977-05-08", 1200),
+                                          ("1977-05-09", 900)]):
+            rid = make_release(conn, source_id=f"r{i}", concert_date=date)
+            make_track(conn, release_id=rid, song_id=song_id, duration=dur,
+                       track_num=1)
+        conn.commit()
+
+        [(sid, (n, mean, var, first, last), _)] = _per_song_shows(conn)
+        assert sid == song_id
+        assert n == 3
+        assert abs(mean - statistics.mean([1500, 1200, 900])) < 1e-9
+        assert abs(var - statistics.variance([1500, 1200, 900])) < 1e-6
+        assert (first, last) == ("1977-05-08", "1977-05-10")
+
+    def test_single_show_has_no_variance(self, conn):
+        song_id = db.get_or_create_song(conn, "Dark Star")
+        rid = make_release(conn, source_id="r1", concert_date="1977-05-08")
+        make_track(conn, release_id=rid, song_id=song_id, duration=600, track_num=1)
+        conn.commit()
+
+        [(_, summary, _)] = _per_song_shows(conn)
+        assert summary[2] is None
+
+    def test_identical_durations_have_zero_variance(self, conn):
+        song_id = db.get_or_create_song(conn, "Playing in the Band")
+        for i in range(5):
+            rid = make_release(conn, source_id=f"r{i}",
+                               concert_date=f"1977-05-{10 + i:02d}")
+            make_track(conn, release_id=rid, song_id=song_id,
+                       duration=1234.567, track_num=1)
+        conn.commit()
+
+        [(_, summary, _)] = _per_song_shows(conn)
+        assert summary[2] == 0.0
+
 
 class TestComputeSongStats:
     """Tests for the full stats computation pipeline."""
@@ -390,11 +459,11 @@ class TestDetectSandwiches:
         assert all(r["sandwich_duration"] is None for r in rows)
 
     def test_sandwich_in_per_show_durations(self, conn):
-        """_per_show_durations should use sandwich_duration when available."""
+        """Per-show durations should use sandwich_duration when available."""
         pitb_id, _ = self._setup_sandwich(conn)
         detect_sandwiches(conn, verbose=False)
 
-        data = _per_show_durations(conn)
+        data = _durations(conn)
         assert pitb_id in data
         # Should be the sandwiched total (2100), not MAX of segments (1200)
         assert data[pitb_id][0][1] == 2100
@@ -425,6 +494,6 @@ class TestDetectSandwiches:
         make_track(conn, release_id=rid2, song_id=song_id, duration=2700, track_num=1)
         conn.commit()
 
-        data = _per_show_durations(conn)
+        data = _durations(conn)
         # Should pick the 2700 release (tiebreaker by duration)
         assert data[song_id][0][1] == 2700
@@ -6,10 +6,18 @@ import time
 
 import pytest
 
-from gdtimings.archive_org import _extract_tracks, _process_from_cache
+from gdtimings.archive_org import (
+    _extract_tracks,
+    _iter_prepared,
+    _process_from_cache,
+    _read_slim_cache,
+)
 from gdtimings.cache import (
+    CACHE_SUFFIX,
     cache_path as _cache_path,
+    migrate_legacy_layout,
     read_cache as _read_cache,
+    scan_cache as _scan_cache,
     write_cache as _write_cache,
 )
 
@@ -19,13 +27,47 @@ class TestCachePath:
 
     def test_standard_identifier(self, tmp_path):
         path = _cache_path(str(tmp_path), "gd1977-05-08.sbd.miller.shnf")
-        assert path.parent.name == "gd19"
-        assert path.name == "gd1977-05-08.sbd.miller.shnf.json"
+        assert len(path.parent.name) == 2
+        int(path.parent.name, 16)  # hex shard
+        assert path.parent.parent == tmp_path
+        assert path.name == "gd1977-05-08.sbd.miller.shnf" + CACHE_SUFFIX
 
     def test_short_identifier(self, tmp_path):
         path = _cache_path(str(tmp_path), "ab")
-        assert path.parent.name == "ab"
-        assert path.name == "ab.json"
+        assert len(path.parent.name) == 2
+        assert path.name == "ab" + CACHE_SUFFIX
+
+    def test_same_year_spreads_across_shards(self, tmp_path):
+        shards = {_cache_path(str(tmp_path), f"gd1977-05-{d:02d}.sbd").parent.name
+                  for d in range(1, 29)}
+        assert len(shards) > 10
+
+
+class TestMigrateLegacyLayout:
+    """Tests for moving old identifier[:4] entries into hash shards."""
+
+    def test_moves_legacy_entries(self, tmp_path):
+        legacy = tmp_path / "gd19" / "gd1977-05-08.sbd.json"
+        legacy.parent.mkdir()
+        legacy.write_text(json.dumps({"metadata": {"title": "Old"}}))
+
+        assert migrate_legacy_layout(str(tmp_path)) == 1
+        assert not legacy.exists()
+        assert not legacy.parent.exists()
+        assert _read_cache(str(tmp_path), "gd1977-05-08.sbd") == {
+            "metadata": {"title": "Old"}}
+
+    def test_read_migrates_on_first_use(self, tmp_path):
+        legacy = tmp_path / "gd19" / "gd1977-05-09.sbd.json"
+        legacy.parent.mkdir()
+        legacy.write_text(json.dumps({"a": 1}))
+        assert _read_cache(str(tmp_path), "gd1977-05-09.sbd") == {"a": 1}
+        assert not legacy.exists()
+
+    def test_idempotent(self, tmp_path):
+        _write_cache(str(tmp_path), "gd1977-05-08.sbd", {"a": 1})
+        assert migrate_legacy_layout(str(tmp_path)) == 0
+        assert _read_cache(str(tmp_path), "gd1977-05-08.sbd") == {"a": 1}
 
 
 class TestReadWriteCache:
@@ -37,6 +79,24 @@ class TestReadWriteCache:
         result = _read_cache(str(tmp_path), "test-id")
         assert result == data
 
+    def test_roundtrip_non_ascii(self, tmp_path):
+        data = {"metadata": {"venue": "Théâtre Olympia", "track": 1}}
+        _write_cache(str(tmp_path), "unicode-id", data)
+        assert _read_cache(str(tmp_path), "unicode-id") == data
+
+    def test_roundtrip_large(self, tmp_path):
+        """Large entries take the memory-mapped read path when available."""
+        data = {"files": [{"name": f"t{i:05d}.flac", "length": "300"}
+                          for i in range(5000)]}
+        _write_cache(str(tmp_path), "large-id", data)
+        assert _read_cache(str(tmp_path), "large-id") == data
+
+    def test_overwrite_leaves_no_temp_files(self, tmp_path):
+        _write_cache(str(tmp_path), "test-id", {"v": 1})
+        _write_cache(str(tmp_path), "test-id", {"v": 2})
+        assert _read_cache(str(tmp_path), "test-id") == {"v": 2}
+        assert not list(tmp_path.rglob("*.tmp"))
+
     def test_missing_returns_none(self, tmp_path):
         result = _read_cache(str(tmp_path), "nonexistent")
         assert result is None
@@ -64,6 +124,104 @@ class TestReadWriteCache:
         result = _read_cache(str(tmp_path), "stale-id", max_age_seconds=3600)
         assert result is None
 
+    def test_max_age_missing_returns_none(self, tmp_path):
+        assert _read_cache(str(tmp_path), "nonexistent", max_age_seconds=3600) is None
+
+
+class TestCompressedCache:
+    """Tests for zstd-compressed entries (needs zstandard)."""
+
+    @pytest.fixture(autouse=True)
+    def _need_zstd(self):
+        pytest.importorskip("zstandard")
+
+    def test_written_compressed(self, tmp_path):
+        _write_cache(str(tmp_path), "zst-id", {"v": 1})
+        path = _cache_path(str(tmp_path), "zst-id")
+        assert path.name == "zst-id.json.zst"
+        assert not path.read_bytes().startswith(b"{")
+        assert _read_cache(str(tmp_path), "zst-id") == {"v": 1}
+
+    def test_reads_plain_json_entry(self, tmp_path):
+        path = _cache_path(str(tmp_path), "plain-id").with_name("plain-id.json")
+        path.parent.mkdir(parents=True)
+        path.write_text(json.dumps({"v": 1}))
+        assert _read_cache(str(tmp_path), "plain-id") == {"v": 1}
+        assert set(_scan_cache(str(tmp_path))) == {"plain-id"}
+
+    def test_rewrite_replaces_plain_entry(self, tmp_path):
+        plain = _cache_path(str(tmp_path), "plain-id").with_name("plain-id.json")
+        plain.parent.mkdir(parents=True)
+        plain.write_text(json.dumps({"v": 1}))
+        _write_cache(str(tmp_path), "plain-id", {"v": 2})
+        assert not plain.exists()
+        assert _read_cache(str(tmp_path), "plain-id") == {"v": 2}
+
+
+class TestScanCache:
+    """Tests for _scan_cache() directory indexing."""
+
+    def test_indexes_written_entries(self, tmp_path):
+        _write_cache(str(tmp_path), "gd1977-05-08.sbd", {"a": 1})
+        _write_cache(str(tmp_path), "ab", {"b": 2})
+        index = _scan_cache(str(tmp_path))
+        assert set(index) == {"gd1977-05-08.sbd", "ab"}
+        path = _cache_path(str(tmp_path), "ab")
+        assert index["ab"] == os.stat(path).st_mtime
+
+    def test_missing_dir_is_empty(self, tmp_path):
+        assert _scan_cache(str(tmp_path / "nope")) == {}
+
+
+class TestReadSlimCache:
+    """Tests for _read_slim_cache() field trimming."""
+
+    def test_keeps_only_used_fields(self, tmp_path):
+        data = {
+            "metadata": {"title": "T", "date": "1977-05-08",
+                         "description": "x" * 1000, "notes": "long"},
+            "files": [
+                {"source": "original", "name": "t01.flac"},
+                {"source": "derivative", "name": "t01.mp3"},
+            ],
+            "reviews": [{"body": "great show"}],
+        }
+        _write_cache(str(tmp_path), "slim-id", data)
+        slim = _read_slim_cache(str(tmp_path), "slim-id")
+        assert slim == {
+            "metadata": {"title": "T", "date": "1977-05-08"},
+            "files": [{"source": "original", "name": "t01.flac"}],
+        }
+
+    def test_missing_returns_none(self, tmp_path):
+        assert _read_slim_cache(str(tmp_path), "nonexistent") is None
+
+
+class TestIterPrepared:
+    """Tests for the worker-process Phase 2 pipeline."""
+
+    def test_yields_in_order(self, tmp_path):
+        item = {
+            "metadata": {"title": "T", "coverage": "Ithaca, NY"},
+            "files": [{"source": "original", "format": "Flac", "length": "300",
+                       "title": "Dark Star", "track": "1", "name": "t01.flac"}],
+        }
+        _write_cache(str(tmp_path), "gd1977-05-08.sbd.a", item)
+        _write_cache(str(tmp_path), "gd1977-05-09.sbd.b", {"metadata": {}})
+        ids = ["gd1977-05-08.sbd.a", "missing", "gd1977-05-09.sbd.b"]
+
+        results = [(ident, fut.result())
+                   for ident, fut in _iter_prepared(str(tmp_path), ids, workers=2)]
+
+        assert [ident for ident, _ in results] == ids
+        found, (release, tracks) = results[0][1]
+        assert found
+        assert release["concert_date"] == "1977-05-08"
+        assert release["recording_type"] == "SBD"
+        assert tracks == [("Dark Star", 1, 300.0)]
+        assert results[1][1] == (False, None)
+        assert results[2][1] == (True, None)  # no tracks to insert
+
 
 class TestProcessFromCache:
     """Tests for _process_from_cache()."""
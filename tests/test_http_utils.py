@@ -0,0 +1,60 @@
+"""Tests for shared HTTP helpers."""
+
+import time
+from types import SimpleNamespace
+
+from gdtimings.http_utils import TokenBucket, _quota_wait, _retry_delay
+
+
+def _resp(**headers):
+    return SimpleNamespace(headers=headers)
+
+
+class TestRetryDelay:
+    """Tests for _retry_delay() backoff."""
+
+    def test_numeric_retry_after(self):
+        assert _retry_delay(_resp(**{"Retry-After": "7"}), 0) == 7.0
+
+    def test_http_date_retry_after_falls_back(self):
+        resp = _resp(**{"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})
+        assert 1.0 <= _retry_delay(resp, 0) <= 1.5
+
+    def test_exponential_with_jitter(self):
+        for attempt, base in ((0, 1.0), (1, 2.0), (3, 8.0)):
+            delay = _retry_delay(_resp(), attempt)
+            assert base <= delay <= base * 1.5
+
+    def test_capped(self):
+        assert _retry_delay(_resp(), 20) <= 45.0
+
+
+class TestQuotaWait:
+    """Tests for _quota_wait() X-RateLimit handling."""
+
+    def test_no_headers(self):
+        assert _quota_wait(_resp()) == 0.0
+
+    def test_quota_left(self):
+        resp = _resp(**{"X-RateLimit-Remaining": "50",
+                        "X-RateLimit-Reset": str(time.time() + 10)})
+        assert _quota_wait(resp) == 0.0
+
+    def test_quota_spent_waits_for_reset(self):
+        resp = _resp(**{"X-RateLimit-Remaining": "0",
+                        "X-RateLimit-Reset": str(time.time() + 5)})
+        assert 4.0 < _quota_wait(resp) <= 5.0
+
+    def test_relative_reset(self):
+        resp = _resp(**{"X-RateLimit-Remaining": "1", "X-RateLimit-Reset": "3"})
+        assert _quota_wait(resp) == 3.0
+
+
+class TestTokenBucketHold:
+
+    def test_hold_delays_next_acquire(self):
+        bucket = TokenBucket(rate=100, burst=1)
+        bucket.hold(0.05)
+        t0 = time.monotonic()
+        bucket.acquire()
+        assert time.monotonic() - t0 >= 0.04
@@ -12,6 +12,10 @@ class TestNormalizeState:
     def test_full_name_passthrough(self):
         assert normalize_state("California") == "California"
 
+    def test_full_name_any_case(self):
+        assert normalize_state("new york") == "New York"
+        assert normalize_state("CALIFORNIA") == "California"
+
     def test_dotted_abbreviation(self):
         assert normalize_state("R.I.") == "Rhode Island"
         assert normalize_state("D.C.") == "District of Columbia"
@@ -60,6 +64,7 @@ class TestIsUsState:
 
     def test_full_name(self):
         assert is_us_state("California") is True
+        assert is_us_state("new york") is True
 
     def test_non_us(self):
         assert is_us_state("England") is False
@@ -1,6 +1,11 @@
 """Tests for MusicBrainz date parsing and release processing."""
 
+import pytest
+import requests
+
+from gdtimings import db, musicbrainz
 from gdtimings.musicbrainz import parse_date_from_title
+from gdtimings.normalize import make_song_resolver
 
 
 class TestParseDateFromTitle:
@@ -40,6 +45,17 @@ class TestParseDateFromTitle:
         title = "Boston Music Hall, Boston, MA 6/9/76"
         assert parse_date_from_title(title) == "1976-06-09"
 
+    def test_iso_date_wins_over_earlier_us_date(self):
+        assert parse_date_from_title("6/9/76 1974-05-21") == "1974-05-21"
+
+    def test_invalid_iso_falls_back_to_us_date(self):
+        assert parse_date_from_title("2020-01-15 6/9/76") == "1976-06-09"
+
+    def test_day_past_month_end(self):
+        assert parse_date_from_title("4/31/77") is None
+        assert parse_date_from_title("1977-02-30") is None
+        assert parse_date_from_title("2/29/80") == "1980-02-29"
+
     def test_single_digit_month_day(self):
         """Single-digit month and day: 3/1/73."""
         assert parse_date_from_title("3/1/73") == "1973-03-01"
@@ -53,3 +69,124 @@ class TestParseDateFromTitle:
         """Dash separator: Winterland Arena, San Francisco, CA - 6/7/77."""
         title = "Winterland Arena, San Francisco, CA - 6/7/77"
         assert parse_date_from_title(title) == "1977-06-07"
+
+
+class TestInsertRelease:
+    """Tests for _insert_release() on ws/2 JSON release data."""
+
+    def _release(self):
+        return {
+            "id": "rel-1",
+            "title": "Dick's Picks Volume 1",
+            "media": [{
+                "position": 1,
+                "title": "Curtis Hixon Hall, Tampa, FL 12/19/73",
+                "tracks": [
+                    {"title": "Here Comes Sunshine", "length": 564000,
+                     "recording": {"title": "Here Comes Sunshine",
+                                   "length": 563000}},
+                    {"title": "Big River", "length": None,
+                     "recording": {"title": "Big River", "length": 320500}},
+                ],
+            }],
+        }
+
+    def test_inserts_tracks_with_durations(self, conn):
+        assert musicbrainz._insert_release(conn, "rel-1", self._release(),
+                                           "complete", verbose=False) == (1, 2)
+        rows = conn.execute(
+            "SELECT title_raw, duration_seconds FROM tracks ORDER BY track_number"
+        ).fetchall()
+        assert [tuple(r) for r in rows] == [("Here Comes Sunshine", 564.0),
+                                            ("Big River", 320.5)]
+        release = conn.execute("SELECT concert_date FROM releases").fetchone()
+        assert release["concert_date"] == "1973-12-19"
+
+    def test_second_run_skips_release(self, conn):
+        musicbrainz._insert_release(conn, "rel-1", self._release(), "complete",
+                                    verbose=False)
+        assert musicbrainz._insert_release(conn, "rel-1", self._release(),
+                                           "complete", verbose=False) == (0, 0)
+
+    def test_scrape_release_groups_skips_failures(self, conn, monkeypatch):
+        def best(rg_mbid):
+            if rg_mbid == "rg-bad":
+                raise requests.HTTPError("503")
+            return {"id": "rel-1"} if rg_mbid == "rg-1" else None
+
+        monkeypatch.setattr(musicbrainz, "_get_releases_for_release_group", best)
+        monkeypatch.setattr(musicbrainz, "_get_release_details",
+                            lambda mbid: self._release())
+        result = musicbrainz._scrape_release_groups(
+            conn, ["rg-bad", "rg-empty", "rg-1"], "complete", verbose=False)
+        assert result == (1, 2)
+
+    def test_known_release_not_fetched(self, conn, monkeypatch):
+        monkeypatch.setattr(musicbrainz, "_get_releases_for_release_group",
+                            lambda rg_mbid: {"id": "rel-1"})
+        monkeypatch.setattr(musicbrainz, "_get_release_details",
+                            lambda mbid: self._release())
+        musicbrainz._scrape_release_groups(conn, ["rg-1"], "complete", verbose=False)
+        known = db.musicbrainz_release_mbids(conn)
+        assert known == {"rel-1"}
+
+        def fail(mbid):
+            raise AssertionError("fetched a known release")
+
+        monkeypatch.setattr(musicbrainz, "_get_release_details", fail)
+        assert musicbrainz._scrape_release_groups(
+            conn, ["rg-1"], "complete", verbose=False, skip=known) == (0, 0)
+
+    def test_insert_error_cancels_queued_fetches(self, conn, monkeypatch):
+        fetched = []
+
+        def best(rg_mbid):
+            fetched.append(rg_mbid)
+            return {"id": rg_mbid}
+
+        def broken(*args):
+            raise ValueError("bad release")
+
+        monkeypatch.setattr(musicbrainz, "_get_releases_for_release_group", best)
+        monkeypatch.setattr(musicbrainz, "_get_release_details", lambda mbid: {})
+        monkeypatch.setattr(musicbrainz, "_insert_release", broken)
+        with pytest.raises(ValueError):
+            musicbrainz._scrape_release_groups(
+                conn, [f"rg-{n}" for n in range(100)], "complete", verbose=False)
+        assert len(fetched) <= 2 * musicbrainz.MUSICBRAINZ_FETCH_WORKERS + 1
+
+    def test_next_series_matches_songs_established_before(self, conn, monkeypatch):
+        titles = {"rel-1": ["Xylophone Boogaloo"] * 50, "rel-2": ["Xylophone Bogaloo"]}
+
+        def details(mbid):
+            return {"id": mbid, "title": mbid, "media": [{
+                "position": 1, "title": "Winterland Arena - 12/31/1978",
+                "tracks": [{"title": t, "length": 300000} for t in titles[mbid]],
+            }]}
+
+        monkeypatch.setattr(musicbrainz, "_get_releases_for_release_group",
+                            lambda rg_mbid: {"id": rg_mbid.replace("rg", "rel")})
+        monkeypatch.setattr(musicbrainz, "_get_release_details", details)
+        resolve = make_song_resolver(conn)
+        for rg_mbid in ("rg-1", "rg-2"):  # one series each
+            musicbrainz._scrape_release_groups(conn, [rg_mbid], "complete",
+                                               verbose=False, resolve_song=resolve)
+        songs = conn.execute("SELECT canonical_name FROM songs").fetchall()
+        assert [r["canonical_name"] for r in songs] == ["Xylophone Boogaloo"]
+
+
+class TestListingCache:
+    """Tests for _mb_get_listing() on-disk caching."""
+
+    def test_second_call_served_from_cache(self, tmp_path, monkeypatch):
+        calls = []
+
+        def fake_get(path, **params):
+            calls.append(path)
+            return {"releases": [{"id": "rel-1"}]}
+
+        monkeypatch.setattr(musicbrainz, "MUSICBRAINZ_CACHE_DIR", str(tmp_path))
+        monkeypatch.setattr(musicbrainz, "_mb_get", fake_get)
+        for _ in range(2):
+            assert musicbrainz._get_releases_for_release_group("rg-1") == {"id": "rel-1"}
+        assert calls == ["release"]
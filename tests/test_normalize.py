@@ -2,7 +2,15 @@
 
 import pytest
 
-from gdtimings.normalize import clean_title, normalize_song
+from gdtimings import db, normalize
+from gdtimings.normalize import (
+    clean_title,
+    invalidate_db_songs_cache,
+    make_song_resolver,
+    normalize_song,
+    normalize_songs_batch,
+)
+from tests.conftest import make_release, make_track
 
 
 class TestCleanTitle:
@@ -46,6 +54,12 @@ class TestCleanTitle:
         """Bare D1T12 codes with no song name are dropped."""
         assert clean_title("D1T12") == ""
         assert clean_title("D2T05") == ""
+        assert clean_title("disc305") == ""
+        assert clean_title("4-26-69d1t03") == ""
+
+    def test_date_prefix_dropped(self):
+        assert clean_title("05/85 - Thursday") == ""
+        assert clean_title("95-02-20 211 Crowd") == ""
 
     def test_spelled_out_disc_track(self):
         """Spelled-out disc/track prefixes."""
@@ -302,6 +316,11 @@ class TestCleanTitle:
         assert clean_title("Encore Break/Crowd/Tuning") == ""
         assert clean_title("crowd and tuning") == ""
 
+    def test_non_song_trailing_keyword(self):
+        assert clean_title("Bobby Banter") == ""
+        assert clean_title("Jam/tuning") == ""
+        assert clean_title("Tuning Fork Blues") == "Tuning Fork Blues"
+
     def test_non_song_intro(self):
         assert clean_title("Introduction") == ""
         assert clean_title("intro") == ""
@@ -517,3 +536,92 @@ class TestNormalizeSong:
         """'01 Hell In A Bucket' resolves correctly."""
         _, name, _ = normalize_song(conn, "01 Hell In A Bucket")
         assert name == "Hell in a Bucket"
+
+
+class TestNormalizeSongsBatch:
+    """Tests for normalize_songs_batch() against per-title normalize_song()."""
+
+    TITLES = ["Sugaree", "sugaree", "Sugare", "01. Dark Star >", "tuning", "",
+              "Quetzal Shuffle", "quetzal shuffle", "Truckin'", "Dark Star"]
+
+    def test_matches_sequential(self, conn):
+        other = db.get_connection(db_path=":memory:")
+        try:
+            expected = [normalize_song(other, t) for t in self.TITLES]
+            other.commit()
+            assert normalize_songs_batch(conn, self.TITLES) == expected
+            aliases = "SELECT alias, song_id, alias_type FROM song_aliases ORDER BY alias"
+            assert ([tuple(r) for r in conn.execute(aliases)]
+                    == [tuple(r) for r in other.execute(aliases)])
+        finally:
+            other.close()
+
+    def test_uses_existing_aliases(self, conn):
+        song_id = normalize_song(conn, "Quetzal Shuffle")[0]
+        conn.commit()
+        assert normalize_songs_batch(conn, ["quetzal shuffle"]) == [
+            (song_id, "Quetzal Shuffle", "alias")]
+
+
+class TestBestMatch:
+    """Tests for _best_match() fuzzy scoring."""
+
+    def test_identical_candidate_short_circuits(self, monkeypatch):
+        monkeypatch.setattr(normalize, "_rf_process", None)
+        monkeypatch.setattr(normalize, "_SequenceMatcher",
+                            lambda *a: pytest.fail("scored an identical input"))
+        assert normalize._best_match("sugaree", ("bertha", "sugaree"), 0.6) == (1, 1.0)
+
+    def test_scores_with_difflib_whether_or_not_rapidfuzz_is_installed(self):
+        pytest.importorskip("rapidfuzz")
+        # rapidfuzz's LCS ratio is 0.90 here, difflib's only 0.39
+        assert normalize._best_match("roud andaround", ("around and around",),
+                                     0.85) is None
+        assert normalize._best_match("dark stat", ("dark star", "dark stars"),
+                                     0.6) == (0, 8 / 9)
+
+    def test_below_cutoff_is_none(self):
+        assert normalize._best_match("zzzz", ("bertha", "sugaree"), 0.6) is None
+
+
+class TestSongResolver:
+    """Tests for the per-run memoizing resolver."""
+
+    def test_matches_normalize_song(self, conn):
+        resolve = make_song_resolver(conn)
+        assert resolve("Sugare") == normalize_song(conn, "Sugare")[0]
+        assert resolve("") is None
+
+    def test_repeat_skips_lookup(self, conn, monkeypatch):
+        resolve = make_song_resolver(conn)
+        song_id = resolve("Dark Star")
+        monkeypatch.setattr("gdtimings.normalize.normalize_song",
+                            lambda *a: pytest.fail("not memoized"))
+        assert resolve("Dark Star") == song_id
+
+
+class TestEstablishedDbSongs:
+    """Tests for step 5's cached list of songs with >=50 tracks."""
+
+    def _establish(self, conn, name):
+        song_id = db.get_or_create_song(conn, name)
+        release_id = make_release(conn, source_id="est-1")
+        for n in range(50):
+            make_track(conn, release_id=release_id, song_id=song_id,
+                       duration=300, track_num=n + 1)
+        return song_id
+
+    def test_fuzzy_matches_established_song(self, conn):
+        invalidate_db_songs_cache()
+        song_id = self._establish(conn, "Xylophone Boogaloo")
+        assert normalize_song(conn, "Xylophone Bogaloo") == (
+            song_id, "Xylophone Boogaloo", "fuzzy")
+
+    def test_invalidation_picks_up_new_songs(self, conn):
+        invalidate_db_songs_cache()
+        normalize_song(conn, "Quetzal Shuffle")  # caches an empty list
+        song_id = self._establish(conn, "Xylophone Boogaloo")
+        conn.commit()
+        invalidate_db_songs_cache()  # as the scrapers do after each commit
+        assert normalize_song(conn, "Xylophone Bogaloo") == (
+            song_id, "Xylophone Boogaloo", "fuzzy")
@@ -107,9 +107,7 @@ class TestExtractTracks:
         files = [self._file(title="Dark Star", length="600", track=1)]
         tracks = _extract_tracks(files)
         assert len(tracks) == 1
-        assert tracks[0]["title_raw"] == "Dark Star"
-        assert tracks[0]["duration"] == 600.0
-        assert tracks[0]["track"] == 1
+        assert tracks[0] == ("Dark Star", 1, 600.0)
 
     def test_filters_derivatives(self):
         files = [self._file(source="derivative")]
@@ -144,15 +142,15 @@ class TestExtractTracks:
             self._file(title="Song A", track=1, length="600", name="t01.flac"),
         ]
         tracks = _extract_tracks(files)
-        assert tracks[0]["title_raw"] == "Song A"
-        assert tracks[1]["title_raw"] == "Song B"
+        assert tracks[0][0] == "Song A"
+        assert tracks[1][0] == "Song B"
 
     def test_fallback_to_filename(self):
         """If no title, use filename without extension."""
         files = [self._file(title="", name="gd77-dark_star.flac",
                             length="600", track=1)]
         tracks = _extract_tracks(files)
-        assert tracks[0]["title_raw"] == "gd77-dark_star"
+        assert tracks[0][0] == "gd77-dark_star"
 
     def test_assigns_missing_track_numbers(self):
         files = [
@@ -160,11 +158,11 @@ class TestExtractTracks:
             self._file(title="Song B", length="400", name="b.flac"),
         ]
         tracks = _extract_tracks(files)
-        assert tracks[0]["track"] == 1
-        assert tracks[1]["track"] == 2
+        assert tracks[0][1] == 1
+        assert tracks[1][1] == 2
 
     def test_track_number_slash_format(self):
         """Archive.org sometimes uses '3/12' format for track numbers."""
         files = [self._file(track="3/12", length="300")]
         tracks = _extract_tracks(files)
-        assert tracks[0]["track"] == 3
+        assert tracks[0][1] == 3